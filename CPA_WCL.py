@@ -5,17 +5,27 @@ import operator
 import json
 import os
 import sys
-from openpyxl.styles import PatternFill, Font
 from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl import Workbook
 import threading
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, wait
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
 from datetime import datetime
-from queue import Queue
+from queue import Empty, Queue
 from appdirs import user_data_dir  # Added for cross-platform config storage
+from cell_engine import (AnalysisCancelled, AnalysisResult, AnalysisScheduler,
+                         CancelToken, KpiCube,
+                         StreamingCubeBuilder, evaluate_rule, evaluate_shard,
+                         integer_columns, merge_shard_results)
+from kpi_loader import (ParseCache, iter_sheet_chunks, map_technology_sheets,
+                        missing_columns, open_workbook, read_headers,
+                        read_sheet, required_columns, resolve_sheet)
+from report_export import (DATA_EXPORTS, write_full_report,
+                           write_network_report, write_selected_cells)
 
 
 # Modern color palette
@@ -67,6 +77,13 @@ def resource_path(relative_path):
         return os.path.join(os.path.abspath("."), relative_path)
 
 
+def user_data_path(relative_path):
+    """Get a per-user path for data kept between runs of the app"""
+    base_path = os.environ.get("LOCALAPPDATA") or \
+        os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base_path, "CellPerformanceAnalyzer", relative_path)
+
+
 RULES_FILE = resource_path("djezzy_rules.json")
 
 # ====== RULES MANAGEMENT ======
@@ -128,6 +145,9 @@ ops = {
     ">": operator.gt, "<": operator.lt, "==": operator.eq
 }
 
+# Technology choice that analyzes every sheet of a multi-sheet workbook
+ALL_TECHNOLOGIES = "All"
+
 # ====== App Configuration ======
 
 
@@ -184,14 +204,48 @@ class AppConfig:
 
 
 class CellAnalyzer:
-    def __init__(self):
+    # "vectorized" evaluates every cell at once (cell_engine), "per_cell" is
+    # the original cell-by-cell implementation kept for cross-checking
+    ENGINES = ("vectorized", "per_cell")
+    # "processes" shards the cube over the scheduler's process pool
+    # (vectorized engine only)
+    EXECUTION_MODES = ("threads", "processes")
+    # Below this many cells per shard the pool costs more than it saves
+    MIN_SHARD_CELLS = 5000
+    # Seconds between cancellation checks while waiting on worker tasks
+    CANCEL_POLL = 0.1
+    # A cell is flagged when this many of its last 5 days are bad
+    MIN_LAST_5_BAD = 4
+    SORT_COLUMNS = ["Score", "Last_5_days"]
+
+    def __init__(self, engine="vectorized", execution="threads", max_workers=None):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown analysis engine: {engine}")
+        if execution not in self.EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {execution}")
+        self.engine = engine
+        self.execution = execution
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # One bounded worker pool for all analysis runs of this analyzer
+        self.scheduler = AnalysisScheduler(self.max_workers)
         self.ops = {
             ">=": operator.ge, "<=": operator.le,
             ">": operator.gt, "<": operator.lt, "==": operator.eq
         }
         self.load_rules()
+        # Parsed sheets survive restarts in a per-user cache (the resource
+        # directory of the frozen build is temporary)
+        self.parse_cache = ParseCache(user_data_path("parse_cache"))
         self.data_cache = {}
+        self.cube_cache = {}
         self.analysis_cache = {}
+        self.load_warnings = {}
+
+    def set_execution(self, execution):
+        """Switch the execution mode used by the next analysis runs"""
+        if execution not in self.EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {execution}")
+        self.execution = execution
 
     def load_rules(self):
         """Load rules with proper initialization and migration"""
@@ -229,93 +283,411 @@ class CellAnalyzer:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save rules: {str(e)}")
 
-    def analyze_technology(self, file_path, tech):
-        """Analyze a single technology and return summary and details"""
+    def analyze_technology(self, file_path, tech, progress=None, cancel=None,
+                           sheet_name=None, workbook=None):
+        """Analyze a single technology and return summary and details.
+
+        progress, if given, is called from the analysis threads with a dict
+        (tech, done, total, total_cells, delta) each time a rule or cell
+        shard is evaluated; delta is an AnalysisResult of the new rows.
+        Cancelling the CancelToken cancel raises AnalysisCancelled; nothing
+        of the run is cached then. sheet_name skips looking up the sheet;
+        workbook is an open_workbook handle to parse it from.
+        """
+        cancel = cancel or CancelToken()
         try:
             # Check cache first
             cache_key = f"{file_path}_{tech}"
             if cache_key in self.analysis_cache:
                 return self.analysis_cache[cache_key]
 
-            # Load data with caching
-            if cache_key not in self.data_cache:
-                xls = pd.ExcelFile(file_path)
-                # sheet name must be dynamic
-                df = pd.read_excel(xls)
-                df["Date"] = pd.to_datetime(df["Date"], dayfirst=True)
-                self.data_cache[cache_key] = df
-            else:
-                df = self.data_cache[cache_key]
+            df = self.load_data(file_path, tech, sheet_name, cancel, workbook)
+            total_cells = len(df["Cell Name"].unique())
+            rules = self.rules.get(tech, [])
+            int_columns = integer_columns(df, rules)
+            report = self._progress_reporter(progress, tech, total_cells,
+                                             int_columns)
+            details = AnalysisResult.from_rule_results(
+                self._evaluate_rules(cache_key, df, rules, report, cancel),
+                rules, int_columns)
 
-            cell_names = df["Cell Name"].unique()
-            total_cells = len(cell_names)
+            # Cache results
+            result = self._collect_results(tech, total_cells, details)
+            self.analysis_cache[cache_key] = result
+            return result
 
-            summary = {
-                "technology": tech,
-                "total_cells": total_cells,
-                "critical": 0,
-                "warning": 0,
-                "healthy": total_cells,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
+        except AnalysisCancelled:
+            raise
+        except Exception as e:
+            print(f"Error processing {tech} sheet: {str(e)}")
+            return None, None
+
+    def analyze_technology_streaming(self, file_path, tech, sheet_name=None,
+                                     chunksize=50000, progress=None,
+                                     cancel=None, workbook=None):
+        """Analyze a technology by streaming its sheet in chunks.
+
+        Rows are folded into per-cell accumulators for the latest days only,
+        so memory is bounded by the cell count instead of the row count.
+        Returns the same (summary, cell_details) as analyze_technology;
+        cancel is checked after every chunk.
+        """
+        cancel = cancel or CancelToken()
+        try:
+            cache_key = f"{file_path}_{tech}"
+            rules = self.rules.get(tech, [])
+            if sheet_name is None:
+                sheet_name = resolve_sheet(file_path, tech, self.rules)
+
+            builder = StreamingCubeBuilder(rules)
+            for chunk in iter_sheet_chunks(file_path, sheet_name,
+                                           required_columns(rules), chunksize,
+                                           workbook):
+                cancel.check()
+                builder.add(chunk)
+            cancel.check()
+
+            missing = builder.missing_columns()
+            if missing:
+                print(f"{tech} sheet '{sheet_name}' lacks rule columns: {missing}")
+            self.load_warnings[cache_key] = missing
+
+            cube = builder.build()
+            self._report_cube(tech, cube)
+            self.cube_cache[cache_key] = cube
+            report = self._progress_reporter(progress, tech, cube.n_cells,
+                                             cube.integer_columns())
+            details = AnalysisResult.from_rule_results(
+                self._evaluate_cube(cube, rules, report, cancel), rules,
+                cube.integer_columns())
+            result = self._collect_results(tech, cube.n_cells, details)
+            self.analysis_cache[cache_key] = result
+            return result
 
-            cell_details = []
-            problematic_cells = set()
+        except AnalysisCancelled:
+            raise
+        except Exception as e:
+            print(f"Error streaming {tech} sheet: {str(e)}")
+            return None, None
 
-            # Parallel processing of rules with progress tracking
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                futures = []
-                for rule in self.rules.get(tech, []):
-                    futures.append(executor.submit(self.analyze_kpi, df, rule))
+    @staticmethod
+    def _progress_reporter(progress, tech, total_cells, int_columns):
+        """Turn the evaluators' step reports into progress callback dicts"""
+        if progress is None:
+            return None
 
-                for future in futures:
-                    res = future.result()
-                    if res is not None and not res.empty:
-                        for _, row in res.iterrows():
-                            cell_name = row["Cell Name"]
-                            problematic_cells.add(cell_name)
+        def report(done, total, rules, results):
+            progress({
+                "tech": tech,
+                "done": done,
+                "total": total,
+                "total_cells": total_cells,
+                "delta": AnalysisResult.from_rule_results(
+                    results, rules, int_columns),
+            })
+        return report
+
+    def _collect_results(self, tech, total_cells, details):
+        """Build the (summary, cell_details) pair of an AnalysisResult"""
+        critical = len(details.status_rows("Critical"))
+        summary = {
+            "technology": tech,
+            "total_cells": total_cells,
+            "critical": critical,
+            "warning": len(details) - critical,
+            "healthy": total_cells - details.n_cells(),
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        return summary, details
+
+    def load_data(self, file_path, tech, sheet_name=None, cancel=None,
+                  workbook=None):
+        """Load the KPI sheet of a technology, with caching.
+
+        workbook, an open_workbook handle of file_path, is read from in
+        threads mode; worker processes open the file themselves.
+        """
+        cancel = cancel or CancelToken()
+        cache_key = f"{file_path}_{tech}"
+        if cache_key not in self.data_cache:
+            cancel.check()
+            if sheet_name is None:
+                sheet_name = self.parse_cache.sheet_for(file_path, tech)
+            if sheet_name is None:
+                sheet_name = resolve_sheet(file_path, tech, self.rules)
+                self.parse_cache.remember_sheet(file_path, tech, sheet_name)
+
+            # Only read the columns the technology's rules need
+            rules = self.rules.get(tech, [])
+            columns = required_columns(rules)
+            df = self.parse_cache.load(file_path, sheet_name, columns)
+            if df is None:
+                if self.execution == "processes":
+                    future = self.scheduler.submit("parse", read_sheet,
+                                                   file_path, sheet_name,
+                                                   columns, processes=True)
+                    for _ in self._wait_all([future], cancel):
+                        pass
+                    df = future.result()
+                else:
+                    df = read_sheet(file_path, sheet_name, columns,
+                                    cancel=cancel, workbook=workbook)
+                self.parse_cache.store(df, file_path, sheet_name, columns)
+
+            missing = missing_columns(df, rules)
+            if missing:
+                print(f"{tech} sheet '{sheet_name}' lacks rule columns: {missing}")
+            self.load_warnings[cache_key] = missing
+            self._report_memory(tech, df)
+            self.data_cache[cache_key] = df
+        return self.data_cache[cache_key]
 
-                            if row["Status"] == "Critical":
-                                summary["critical"] += 1
-                            else:
-                                summary["warning"] += 1
+    @staticmethod
+    def _report_memory(tech, df):
+        """Print the memory a loaded sheet takes and what compacting saved"""
+        memory = df.attrs.get("memory")
+        if memory is None:
+            after = int(df.memory_usage(deep=True).sum())
+            print(f"{tech}: {len(df)} rows, {after / 2**20:.1f} MB")
+            return
+        before, after = memory["before"], memory["after"]
+        saved = before - after
+        print(f"{tech}: {len(df)} rows, {after / 2**20:.1f} MB "
+              f"(compact schema saved {saved / 2**20:.1f} MB, "
+              f"{100 * saved / max(before, 1):.0f}%)")
 
-                            cell_details.append(row.to_dict())
+    @staticmethod
+    def _report_cube(tech, cube):
+        """Print the shape of a KPI cube and the memory it takes"""
+        print(f"{tech}: KPI cube of {cube.n_cells} cells x {cube.n_days} days, "
+              f"{cube.nbytes / 2**20:.1f} MB")
+
+    def report_scheduler_stats(self):
+        """Print the worker pools' load and task timings since startup"""
+        stats = self.scheduler.stats()
+        print(f"Scheduler: {stats['queued']} queued, {stats['running']} running, "
+              f"{stats['in_flight']} in the process pool")
+        for name, timing in stats["tasks"].items():
+            print(f"  {name}: {timing['count']} tasks, "
+                  f"mean {timing['mean']:.3f}s, max {timing['max']:.3f}s, "
+                  f"waited {timing['wait']:.3f}s")
+
+    def get_load_warnings(self, file_path, tech):
+        """Rule columns missing from the loaded sheets, as {tech: [columns]}"""
+        techs = self.rules if tech == ALL_TECHNOLOGIES else [tech]
+        return {t: self.load_warnings[f"{file_path}_{t}"] for t in techs
+                if self.load_warnings.get(f"{file_path}_{t}")}
+
+    def analyze_workbook(self, file_path, streaming=False, progress=None,
+                         cancel=None):
+        """Analyze every technology of a multi-sheet workbook.
+
+        The workbook is opened once, read-only: its sheets are mapped to
+        2G/3G/4G (by name or column signature), then the mapped sheets are
+        parsed from that same handle and analyzed concurrently (in processes
+        mode the parses run on the process pool instead). Returns {tech: (summary, AnalysisResult)}; progress and
+        cancel are passed on to every technology's analysis. Once the sheets
+        are mapped, progress gets an event with done 0 and no delta for each
+        technology, so the run's technologies are known from the start.
+        """
+        cancel = cancel or CancelToken()
+        workbook = open_workbook(file_path)
+        futures = {}
+        try:
+            mapping = map_technology_sheets(read_headers(workbook), self.rules)
+            if progress is not None:
+                for tech in mapping:
+                    progress({"tech": tech, "done": 0,
+                              "total": len(self.rules.get(tech, [])),
+                              "total_cells": 0, "delta": None})
+
+            def load_and_analyze(tech):
+                if streaming:
+                    return self.analyze_technology_streaming(
+                        file_path, tech, mapping[tech], progress=progress,
+                        cancel=cancel, workbook=workbook)
+                return self.analyze_technology(file_path, tech, progress,
+                                               cancel, sheet_name=mapping[tech],
+                                               workbook=workbook)
+
+            futures = {tech: self.scheduler.submit("technology",
+                                                   load_and_analyze, tech)
+                       for tech in mapping}
+            for _ in self._wait_all(futures.values(), cancel):
+                pass
+        finally:
+            # Running technologies stop at their next check after a cancel;
+            # let them finish so none of them still fills the caches (or
+            # reads the workbook) once this returns
+            wait(futures.values())
+            workbook.close()
+        results = {}
+        for tech, future in futures.items():
+            summary, cell_details = future.result()
+            if summary is not None:
+                results[tech] = (summary, cell_details)
+        return results
 
-            # Update healthy count
-            summary["healthy"] = summary["total_cells"] - \
-                len(problematic_cells)
+    @staticmethod
+    def network_summary(results):
+        """Combine per-technology summaries into one network summary"""
+        summary = {
+            "technology": ALL_TECHNOLOGIES,
+            "total_cells": 0,
+            "critical": 0,
+            "warning": 0,
+            "healthy": 0,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        for tech_summary, _ in results.values():
+            for key in ("total_cells", "critical", "warning", "healthy"):
+                summary[key] += tech_summary[key]
+        return summary
+
+    def find_rule(self, kpi, tech):
+        """Rule of a KPI; with ALL_TECHNOLOGIES every technology is searched"""
+        techs = self.rules if tech == ALL_TECHNOLOGIES else [tech]
+        return next(rule for t in techs for rule in self.rules.get(t, [])
+                    if rule["kpi"] == kpi)
+
+    def get_cube(self, cache_key, df, rules):
+        """Return the KPI cube of a loaded sheet, building it once"""
+        cube = self.cube_cache.get(cache_key)
+        if cube is None or not cube.covers(rules):
+            cube = KpiCube.from_frame(df, rules)
+            self._report_cube(cache_key.rsplit("_", 1)[-1], cube)
+            self.cube_cache[cache_key] = cube
+        return cube
+
+    def clear_cache(self, file_path, tech):
+        """Drop cached data, cube and results of a file/technology pair"""
+        techs = self.rules if tech == ALL_TECHNOLOGIES else [tech]
+        for cache_key in [f"{file_path}_{t}" for t in techs]:
+            for cache in (self.analysis_cache, self.data_cache, self.cube_cache,
+                          self.load_warnings):
+                cache.pop(cache_key, None)
+
+    def _evaluate_rules(self, cache_key, df, rules, report, cancel):
+        """Evaluate every rule of a technology, each result sorted like analyze_kpi.
+
+        report(done, total, rules, results) is called after each step.
+        """
+        if self.engine == "vectorized":
+            cube = self.get_cube(cache_key, df, rules)
+            cancel.check()
+            return self._evaluate_cube(cube, rules, report, cancel)
+
+        # Parallel processing of rules
+        futures = [self.scheduler.submit("rule", self.analyze_kpi, df, rule,
+                                         cancel)
+                   for rule in rules]
+        index = {future: i for i, future in enumerate(futures)}
+        for done, future in enumerate(self._wait_all(futures, cancel), start=1):
+            if report is not None:
+                report(done, len(rules), [rules[index[future]]],
+                       [future.result()])
+        return [future.result() for future in futures]
+
+    def _evaluate_cube(self, cube, rules, report, cancel):
+        """Evaluate every rule on a cube, each result sorted like analyze_kpi.
+
+        Day columns are left numeric (NaN for no data) for AnalysisResult.
+        """
+        if self.execution == "processes":
+            results = self._evaluate_sharded(cube, rules, report, cancel)
+            if results is not None:
+                return results
+
+        results = []
+        for done, rule in enumerate(rules, start=1):
+            cancel.check()
+            res = self._sort_result(
+                cube.evaluate(rule, self.MIN_LAST_5_BAD, raw=True))
+            results.append(res)
+            if report is not None:
+                report(done, len(rules), [rule], [res])
+        return results
+
+    def _sort_result(self, res):
+        if res is None:
+            return None
+        return res.sort_values(by=self.SORT_COLUMNS, ascending=False)
 
-            # Cache results
-            result = (summary, cell_details)
-            self.analysis_cache[cache_key] = result
-            return result
+    def _evaluate_sharded(self, cube, rules, report, cancel):
+        """Evaluate the rules on cell shards of the cube in worker processes.
 
-        except Exception as e:
-            print(f"Error processing {tech} sheet: {str(e)}")
-            return None, None
+        Returns None when the cube is too small to be worth sharding.
+        """
+        n_shards = min(self.max_workers,
+                       -(-cube.n_cells // self.MIN_SHARD_CELLS))
+        if n_shards <= 1:
+            return None
 
-    def analyze_kpi(self, df, rule):
-        """Parallel processing of KPI analysis"""
+        futures = [self.scheduler.submit("shard", evaluate_shard, shard, rules,
+                                         self.MIN_LAST_5_BAD, True,
+                                         processes=True)
+                   for shard in cube.split(n_shards)]
+        for done, future in enumerate(self._wait_all(futures, cancel), start=1):
+            if report is not None:
+                report(done, len(futures), rules,
+                       [self._sort_result(res) for res in future.result()])
+        return [self._sort_result(res) for res in
+                merge_shard_results([future.result() for future in futures])]
+
+    def _wait_all(self, futures, cancel):
+        """Yield futures as they complete, checking cancel while waiting.
+
+        On cancellation the remaining tasks are cancelled (worker processes
+        included) and AnalysisCancelled is raised.
+        """
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=self.CANCEL_POLL,
+                                 return_when=FIRST_COMPLETED)
+            if cancel.cancelled:
+                self.scheduler.cancel(pending)
+                cancel.check()
+            yield from done
+
+    def shutdown(self):
+        """Stop the scheduler's worker threads and processes"""
+        self.scheduler.shutdown(wait=False)
+
+    def analyze_kpi(self, df, rule, cancel=None):
+        """Evaluate one rule over all cells with the configured engine"""
+        cancel = cancel or CancelToken()
         try:
-            latest_dates = sorted(df["Date"].unique())[-7:]  # Last 7 days
-            cell_names = df["Cell Name"].unique()
-
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                futures = [executor.submit(self.process_cell_data, cell, df, rule, latest_dates)
-                           for cell in cell_names]
-                results = [future.result()
-                           for future in futures if future.result() is not None]
+            cancel.check()
+            if self.engine == "vectorized":
+                result_df = evaluate_rule(df, rule, self.MIN_LAST_5_BAD)
+            else:
+                result_df = self._analyze_kpi_per_cell(df, rule, cancel)
 
-            if not results:
+            if result_df is None:
                 return None
-
-            result_df = pd.DataFrame(results)
-            return result_df.sort_values(by=["Score", "Last_5_days"], ascending=False)
+            return result_df.sort_values(by=self.SORT_COLUMNS, ascending=False)
+        except AnalysisCancelled:
+            raise
         except Exception as e:
             print(f"Error in analyze_kpi: {str(e)}")
             return None
 
+    def _analyze_kpi_per_cell(self, df, rule, cancel):
+        """KPI analysis one cell at a time (rules run in parallel instead)"""
+        latest_dates = sorted(df["Date"].unique())[-7:]  # Last 7 days
+        cell_names = df["Cell Name"].unique()
+
+        results = []
+        for cell in cell_names:
+            cancel.check()
+            result = self.process_cell_data(cell, df, rule, latest_dates)
+            if result is not None:
+                results.append(result)
+
+        if not results:
+            return None
+        return pd.DataFrame(results)
+
     def process_cell_data(self, cell_name, df, rule, latest_dates):
         """Process data for a single cell"""
         cell_data = df[df["Cell Name"] == cell_name]
@@ -359,7 +731,7 @@ class CellAnalyzer:
                 daily_values[col_name] = "No Data"
                 daily_values[f"{col_name}_count"] = ""
 
-        if last_5_bad > 3 and last_day:
+        if last_5_bad >= self.MIN_LAST_5_BAD and last_day:
             return {
                 "Cell Name": cell_name,
                 "KPI": rule["kpi"],
@@ -374,10 +746,20 @@ class CellAnalyzer:
 
     def get_worst_cells_for_kpi(self, cell_details, kpi, n):
         """Get the worst performing cells for a specific KPI"""
-        kpi_cells = [cell for cell in cell_details if cell["KPI"] == kpi]
-        sorted_cells = sorted(
-            kpi_cells, key=lambda x: x["Score"], reverse=True)
-        return sorted_cells[:n]
+        return cell_details.take(cell_details.top_rows(kpi, n))
+
+    def rank_worst_cells(self, cell_details, n=100, weights=None):
+        """Network-wide top-n worst cells across every KPI and technology.
+
+        A cell's rank is the sum of its KPI Scores, each times the KPI's
+        weight: weights maps KPI to weight and defaults to the rules'
+        optional "weight" field (1 when unset). Returns a DataFrame as
+        AnalysisResult.rank_cells does.
+        """
+        if weights is None:
+            weights = {rule["kpi"]: rule.get("weight", 1.0)
+                       for rules in self.rules.values() for rule in rules}
+        return cell_details.rank_cells(n, weights)
 
 # ====== GUI Components ======
 
@@ -427,31 +809,346 @@ class PerformanceGraph(ttk.Frame):
         self.canvas = FigureCanvasTkAgg(self.fig, master=self)
         self.canvas.get_tk_widget().pack(fill="both", expand=True, pady=10)
 
-    def update_chart(self, data, x_labels, title=None, ylabel=None):
-        """Update the chart with new data"""
+        self._lines = []      # Line2D artists reused by update_chart
+        self._pie_key = None  # Inputs of the pie on display
+
+    def _reset(self):
         self.ax.clear()
+        self._lines = []
+        self._pie_key = None
+
+    def show_message(self, text):
+        """Replace the chart with a centered message"""
+        self._reset()
+        self.ax.text(0.5, 0.5, text, ha='center', va='center')
+        self.canvas.draw_idle()
 
+    def update_chart(self, data, x_labels, title=None, ylabel=None):
+        """Update the chart with new data.
+
+        The lines of the previous call are moved with set_data instead of
+        being re-plotted, and the canvas redraws when Tk is idle.
+        """
         if isinstance(data, dict):
             # Single dataset
-            self.ax.plot(x_labels, list(data.values()), marker='o')
+            series = [(None, list(data.values()))]
         else:
             # Multiple datasets
-            for cell_data in data:
-                self.ax.plot(
-                    x_labels, cell_data['values'], marker='o', label=cell_data['label'])
+            series = [(cell_data['label'], cell_data['values'])
+                      for cell_data in data]
+
+        relayout = self._pie_key is not None or not self._lines
+        if relayout:
+            self._reset()
+            self.ax.grid(True, linestyle='--', alpha=0.6)
+
+        x = np.arange(len(x_labels))
+        for i, (label, values) in enumerate(series):
+            if i < len(self._lines):
+                self._lines[i].set_data(x, values)
+                self._lines[i].set_label(label)
+            else:
+                line, = self.ax.plot(x, values, marker='o', color=f"C{i}",
+                                     label=label)
+                self._lines.append(line)
+        for line in self._lines[len(series):]:
+            line.remove()
+        del self._lines[len(series):]
+
+        self.ax.set_xticks(x, x_labels)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        if isinstance(data, dict):
+            if self.ax.get_legend():
+                self.ax.get_legend().remove()
+        else:
             self.ax.legend()
+        self.ax.set_title(title or "")
+        self.ax.set_ylabel(ylabel or "")
 
-        if title:
-            self.ax.set_title(title)
-        if ylabel:
-            self.ax.set_ylabel(ylabel)
+        if relayout:
+            self.fig.tight_layout()
+        self.canvas.draw_idle()
 
-        self.ax.grid(True, linestyle='--', alpha=0.6)
+    def update_pie(self, sizes, labels, colors, title, **kwargs):
+        """Draw a pie chart, unless the same pie is already shown"""
+        key = (tuple(sizes), tuple(labels), tuple(colors), title)
+        if key == self._pie_key:
+            return
+        self._reset()
+        self._pie_key = key
+        self.ax.pie(sizes, labels=labels, colors=colors, **kwargs)
+        self.ax.set_title(title)
         self.fig.tight_layout()
-        self.canvas.draw()
+        self.canvas.draw_idle()
+
+
+class VirtualTable(ttk.Frame):
+    """Treeview that only holds the rows currently on screen.
+
+    The table shows the row ids in self.rows of a source AnalysisResult. The
+    tree keeps one item per visible line and scrolling refills those items,
+    so showing or filtering a result costs the same whatever its size.
+    columns are (column id, heading, width, result column) tuples. Clicking
+    a heading sorts by that column using the source's cached sort orders.
+    """
+
+    def __init__(self, parent, columns, height=20, tag_column=None,
+                 tag_colors=None):
+        super().__init__(parent)
+        self.fields = [column[3] for column in columns]
+        self.headings = {column[0]: column[1] for column in columns}
+        self.column_fields = {column[0]: column[3] for column in columns}
+        self.tag_column = tag_column
+        self.sort_column = None  # Column id sorted on, None for row order
+        self.descending = False
+        self.source = None
+        self.rows = np.empty(0, dtype=np.int64)
+        self.offset = 0
+        self.page_size = height
+        self.selected = set()  # Selected row ids, on screen or not
+        self._items = []       # Tree items, one per visible line
+        self._shown = np.empty(0, dtype=np.int64)  # Row ids in _items
+
+        self.tree = ttk.Treeview(
+            self,
+            columns=[column[0] for column in columns],
+            show="headings",
+            selectmode="extended",
+            height=height
+        )
+        for col_id, heading, width, _ in columns:
+            self.tree.heading(col_id, text=heading,
+                              command=lambda c=col_id: self.sort_by(c))
+            self.tree.column(col_id, width=width, anchor="center")
+        for value, color in (tag_colors or {}).items():
+            self.tree.tag_configure(value.lower(), background=color)
+
+        self.yscroll = ttk.Scrollbar(
+            self, orient="vertical", command=self._on_scrollbar)
+        xscroll = ttk.Scrollbar(
+            self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscroll=xscroll.set)
+
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.yscroll.grid(row=0, column=1, sticky="ns")
+        xscroll.grid(row=1, column=0, sticky="ew")
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(3))
+        self.tree.bind("<Prior>", lambda e: self.scroll_by(-self.page_size))
+        self.tree.bind("<Next>", lambda e: self.scroll_by(self.page_size))
+        self.tree.bind("<Up>", lambda e: self._on_arrow(-1))
+        self.tree.bind("<Down>", lambda e: self._on_arrow(1))
+        self.tree.bind("<Configure>", lambda e: self._fit_page())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+    def set_source(self, source, rows=None):
+        """Show a new result, all of its rows unless rows is given"""
+        self.source = source
+        if rows is None:
+            rows = np.arange(len(source) if source is not None else 0)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self._set_sort(None, False)
+        self.offset = 0
+        self.selected = set()
+        self._shown = np.empty(0, dtype=np.int64)  # Rewrite every line
+        self._refresh()
+        self.after_idle(self._fit_page)
+
+    def replace_source(self, source):
+        """Swap in a grown copy of the source, keeping sort and scrolling.
+
+        Rows of the old source must keep their row ids in the new one.
+        """
+        self.source = source
+        self._shown = np.empty(0, dtype=np.int64)  # Rewrite every line
+
+    def set_rows(self, rows):
+        """Show another set of row ids of the same source"""
+        self.rows = self._sorted(np.asarray(rows, dtype=np.int64))
+        if self.selected:
+            selected = np.fromiter(self.selected, dtype=np.int64)
+            self.selected = set(selected[np.isin(selected, self.rows)].tolist())
+        self.scroll_to(self.offset, force=True)
+
+    def scroll_to(self, offset, force=False):
+        """Make row number offset of self.rows the first line on screen"""
+        offset = max(0, min(offset, len(self.rows) - self.page_size))
+        if offset != self.offset or force:
+            self.offset = offset
+            self._refresh()
+
+    def scroll_by(self, lines):
+        self.scroll_to(self.offset + lines)
+        return "break"
+
+    def sort_by(self, col_id):
+        """Sort on a column; clicking it again reverses the order.
+
+        Numbers sort highest first on the first click, text A to Z.
+        """
+        if self.source is None:
+            return
+        if col_id == self.sort_column:
+            descending = not self.descending
+        else:
+            descending = self.source.is_numeric(self.column_fields[col_id])
+        self._set_sort(col_id, descending)
+        self.rows = self._sorted(self.rows)
+        self.scroll_to(0, force=True)
+
+    def _set_sort(self, col_id, descending):
+        for column, heading in self.headings.items():
+            if column == col_id:
+                heading += " \u25bc" if descending else " \u25b2"
+            self.tree.heading(column, text=heading)
+        self.sort_column = col_id
+        self.descending = descending
+
+    def _sorted(self, rows):
+        if self.sort_column is None:
+            return rows
+        return self.source.sort_rows(
+            rows, self.column_fields[self.sort_column], self.descending)
+
+    def selected_rows(self):
+        """Selected row ids, in display order"""
+        if not self.selected:
+            return np.empty(0, dtype=np.int64)
+        return self.rows[np.isin(self.rows, list(self.selected))]
+
+    def row_values(self, rows):
+        """Display values of the given row ids, one list per row"""
+        columns = self.source.display_columns(self.fields, rows)
+        return [list(values) for values in zip(*columns)]
+
+    def _refresh(self):
+        page = self.rows[self.offset:self.offset + self.page_size]
+
+        # Reuse the tree items; only the page length changes their number
+        while len(self._items) < len(page):
+            self._items.append(self.tree.insert("", "end"))
+        if len(self._items) > len(page):
+            self.tree.delete(*self._items[len(page):])
+            del self._items[len(page):]
+
+        # Only lines now showing another row are rewritten
+        shown = self._shown[:len(page)]
+        changed = np.flatnonzero(page[:len(shown)] != shown)
+        changed = np.concatenate([changed, np.arange(len(shown), len(page))])
+        if len(changed):
+            rows = page[changed]
+            tags = self.source.column(self.tag_column, rows) \
+                if self.tag_column else None
+            for i, (line, values) in enumerate(
+                    zip(changed, self.row_values(rows))):
+                self.tree.item(self._items[line], values=values,
+                               tags=(str(tags[i]).lower(),) if tags is not None else ())
+        self._shown = page
+
+        self.tree.selection_set([item for item, row in zip(self._items, page)
+                                 if row in self.selected])
+        if len(self.rows):
+            self.yscroll.set(self.offset / len(self.rows),
+                             (self.offset + len(page)) / len(self.rows))
+        else:
+            self.yscroll.set(0, 1)
+
+    def _fit_page(self):
+        """Match the page size to the number of lines the tree can show"""
+        if not self._items:
+            return
+        bbox = self.tree.bbox(self._items[0])
+        if not bbox:
+            return
+        header, row_height = bbox[1], bbox[3]
+        page_size = max(1, (self.tree.winfo_height() - header) // row_height)
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.scroll_to(self.offset, force=True)
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            step = self.page_size if args[2] == "pages" else 1
+            self.scroll_by(int(args[1]) * step)
+
+    def _on_wheel(self, event):
+        return self.scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_arrow(self, step):
+        """Scroll when the arrow keys move past the first or last line"""
+        if not self._items:
+            return None
+        edge = self._items[0] if step < 0 else self._items[-1]
+        if self.tree.focus() != edge:
+            return None  # Plain move within the page
+        target = self.offset - 1 if step < 0 else self.offset + len(self._shown)
+        if not 0 <= target < len(self.rows):
+            return "break"
+        self.selected = {int(self.rows[target])}
+        self.scroll_by(step)
+        self.tree.focus(edge)
+        return "break"
+
+    def _on_select(self, event=None):
+        chosen = self.tree.selection()
+        self.selected.difference_update(self._shown.tolist())
+        self.selected.update(int(row) for item, row in
+                             zip(self._items, self._shown) if item in chosen)
+
+
+class StatusChannel:
+    """Messages from worker threads to the Tk event loop.
+
+    put() wakes the loop with a virtual event only when the channel goes
+    from drained to pending, so a burst of messages costs one wakeup and
+    nothing runs while the workers are quiet.
+    """
+
+    EVENT = "<<StatusMessage>>"
+
+    def __init__(self, widget, handler):
+        self.widget = widget
+        self._queue = Queue()
+        self._lock = threading.Lock()
+        self._pending = False
+        widget.bind(self.EVENT, lambda event: handler())
+
+    def put(self, message):
+        """Queue a (type, content, token) message; safe from any thread"""
+        self._queue.put(message)
+        with self._lock:
+            if self._pending:
+                return
+            self._pending = True
+        self.widget.event_generate(self.EVENT, when="tail")
+
+    def drain(self):
+        """Take every queued message (GUI thread only)"""
+        with self._lock:
+            self._pending = False
+        messages = []
+        while True:
+            try:
+                messages.append(self._queue.get_nowait())
+            except Empty:
+                return messages
 
 
 class CellPerformanceApp(tk.Tk):
+    # Minimum milliseconds between redraws of partial results
+    FRAME_INTERVAL = 50
+    # Milliseconds the chart controls must be still before the chart redraws
+    CHART_DEBOUNCE = 150
+    # Status chart views (worst cells of a KPI) kept for quick switching
+    CHART_CACHE_SIZE = 32
+
     def __init__(self):
         super().__init__()
         self.title(
@@ -468,17 +1165,29 @@ class CellPerformanceApp(tk.Tk):
         self.selected_tech = ""
         self.summary_data = None
         self.cell_details = None
+        self.tech_results = {}
         self.analysis_results = None
-        self.status_queue = Queue()
+        self.partial_shown = False
+        self.status_queue = StatusChannel(self, self._process_status_queue)
         self.dashboard_ready = False
+        self._redraw_job = None
+        self._last_redraw = 0.0
+        self._chart_job = None
+        self._chart_views = OrderedDict()
+        self._chart_source = None
+        self.cancel_token = None
+        self.export_token = None
 
         # Setup UI
         self._setup_styles()
         self._create_widgets()
         self.show_analysis()  # Start with analysis tab
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
-        # Start status update thread
-        self.after(100, self._process_status_queue)
+    def _on_close(self):
+        """Release analysis workers before closing the window"""
+        self.analyzer.shutdown()
+        self.destroy()
 
     def _setup_styles(self):
         """Configure modern UI styles"""
@@ -585,6 +1294,18 @@ class CellPerformanceApp(tk.Tk):
         self.main_frame = ttk.Frame(self)
         self.main_frame.pack(fill="both", expand=True, padx=20, pady=20)
 
+        # Export progress, shown below every view while a file is written
+        self.export_frame = ttk.Frame(self)
+        self.export_label = ttk.Label(self.export_frame, text="")
+        self.export_label.pack(side="left", padx=5)
+        self.export_bar = ttk.Progressbar(
+            self.export_frame, mode="determinate", length=200, maximum=100)
+        self.export_bar.pack(side="left", expand=True, fill="x", padx=10)
+        self.export_cancel_button = ttk.Button(
+            self.export_frame, text="Cancel Export",
+            command=self._cancel_export)
+        self.export_cancel_button.pack(side="right", padx=5)
+
         # Create frames (initially hidden)
         self.create_analysis_frame()
         self.create_dashboard_frame()
@@ -622,20 +1343,38 @@ class CellPerformanceApp(tk.Tk):
                   style="CardTitle.TLabel").pack(anchor="w")
         self.tech_var = tk.StringVar(value="2G")
         tech_combo = ttk.Combobox(tech_frame, textvariable=self.tech_var,
-                                  values=["2G", "3G", "4G"], state="readonly")
+                                  values=["2G", "3G", "4G", ALL_TECHNOLOGIES],
+                                  state="readonly")
         tech_combo.pack(anchor="w", pady=5, fill="x")
 
+        self.streaming_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(tech_frame, text="Low-memory streaming (very large files)",
+                        variable=self.streaming_var).pack(anchor="w", pady=(5, 0))
+
+        self.processes_var = tk.BooleanVar(
+            value=self.analyzer.execution == "processes")
+        ttk.Checkbutton(tech_frame, text="Use all CPU cores (worker processes)",
+                        variable=self.processes_var).pack(anchor="w", pady=(5, 0))
+
         # Action buttons
         button_frame = ttk.Frame(self.analysis_frame)
         button_frame.pack(fill="x", pady=(10, 0))
 
-        ModernButton(button_frame, text="Start Analysis",
-                     command=self._start_analysis).pack(side="left", padx=5)
+        self.start_button = ModernButton(button_frame, text="Start Analysis",
+                                         command=self._start_analysis)
+        self.start_button.pack(side="left", padx=5)
 
         self.progress_bar = ttk.Progressbar(
             button_frame, mode="indeterminate", length=200)
         self.progress_bar.pack(side="left", expand=True, padx=10)
 
+        self.cancel_button = ttk.Button(button_frame, text="Cancel",
+                                        command=self._cancel_analysis,
+                                        state="disabled")
+        self.cancel_button.pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Clear Cache",
+                   command=self._clear_parse_cache).pack(side="right", padx=5)
+
     def create_dashboard_frame(self):
         """Create the professional dashboard"""
         self.dashboard_frame = ttk.Frame(self.main_frame)
@@ -684,7 +1423,7 @@ class CellPerformanceApp(tk.Tk):
             chart_header, textvariable=self.kpi_chart_var, state="readonly")
         self.kpi_chart_combo.pack(side="right", padx=10)
         self.kpi_chart_combo.bind(
-            "<<ComboboxSelected>>", self._update_status_chart)
+            "<<ComboboxSelected>>", self._schedule_status_chart)
 
         # Number of cells to show
         self.cell_count_var = tk.IntVar(value=5)
@@ -692,7 +1431,7 @@ class CellPerformanceApp(tk.Tk):
         cell_count_frame.pack(side="right", padx=10)
         ttk.Label(cell_count_frame, text="Show top:").pack(side="left")
         ttk.Spinbox(cell_count_frame, from_=1, to=10, width=3, textvariable=self.cell_count_var,
-                    command=self._update_status_chart).pack(side="left")
+                    command=self._schedule_status_chart).pack(side="left")
 
         # The actual chart
         self.status_chart = PerformanceGraph(
@@ -705,6 +1444,16 @@ class CellPerformanceApp(tk.Tk):
 
         ModernButton(action_frame, text="Export Full Report",
                      command=self._export_full_report).pack(side="right", padx=5)
+        ModernButton(action_frame, text="Export Network Report",
+                     command=self._export_network_report).pack(side="right", padx=5)
+
+        # Plain data exports for other tools
+        ModernButton(action_frame, text="Export Data",
+                     command=self._export_data).pack(side="right", padx=5)
+        self.export_format_var = tk.StringVar(value=next(iter(DATA_EXPORTS)))
+        ttk.Combobox(action_frame, textvariable=self.export_format_var,
+                     values=list(DATA_EXPORTS), state="readonly",
+                     width=12).pack(side="right", padx=5)
 
     def create_cell_analysis_frame(self):
         """Create the enhanced cell analysis frame"""
@@ -743,53 +1492,38 @@ class CellPerformanceApp(tk.Tk):
         self.kpi_combo.bind("<<ComboboxSelected>>",
                             lambda e: self._filter_cells())
 
+        # Cell name search, filtered as you type
+        search_frame = ttk.Frame(filter_frame)
+        search_frame.pack(fill="x", pady=5)
+        ttk.Label(search_frame, text="Search:").pack(side="left", padx=(0, 10))
+
+        self.search_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=self.search_var).pack(
+            side="left", fill="x", expand=True, padx=(0, 10))
+        self.search_var.trace_add("write", lambda *args: self._filter_cells())
+        self.match_label = ttk.Label(search_frame, text="")
+        self.match_label.pack(side="left")
+
         # Cell details table
         table_frame = ttk.Frame(self.cell_analysis_frame)
         table_frame.pack(fill="both", expand=True)
 
-        # Create Treeview with scrollbars
+        # Virtual table: only the visible rows are Treeview items
         columns = [
-            ("cell", "Cell Name", 150),
-            ("kpi", "KPI", 200),
-            ("status", "Status", 80),
-            ("score", "Score", 60),
-            ("bad_days", "Bad Days", 80),
-            ("d1", "D1", 60), ("d1_count", "Count", 60),
-            ("d2", "D2", 60), ("d2_count", "Count", 60),
-            ("d3", "D3", 60), ("d3_count", "Count", 60),
-            ("d4", "D4", 60), ("d4_count", "Count", 60),
-            ("d5", "D5", 60), ("d5_count", "Count", 60),
-            ("d6", "D6", 60), ("d6_count", "Count", 60),
-            ("d7", "D7", 60), ("d7_count", "Count", 60)
+            ("cell", "Cell Name", 150, "Cell Name"),
+            ("kpi", "KPI", 200, "KPI"),
+            ("status", "Status", 80, "Status"),
+            ("score", "Score", 60, "Score"),
+            ("bad_days", "Bad Days", 80, "Bad_days"),
         ]
+        for i in range(1, 8):
+            columns.extend([(f"d{i}", f"D{i}", 60, f"d{i}"),
+                            (f"d{i}_count", "Count", 60, f"d{i}_count")])
 
-        self.cell_tree = ttk.Treeview(
-            table_frame,
-            columns=[col[0] for col in columns],
-            show="headings",
-            selectmode="extended",
-            height=20
-        )
-
-        # Configure columns
-        for col_id, heading, width in columns:
-            self.cell_tree.heading(col_id, text=heading)
-            self.cell_tree.column(col_id, width=width, anchor="center")
-
-        # Add scrollbars
-        yscroll = ttk.Scrollbar(
-            table_frame, orient="vertical", command=self.cell_tree.yview)
-        xscroll = ttk.Scrollbar(
-            table_frame, orient="horizontal", command=self.cell_tree.xview)
-        self.cell_tree.configure(yscroll=yscroll.set, xscroll=xscroll.set)
-
-        self.cell_tree.grid(row=0, column=0, sticky="nsew")
-        yscroll.grid(row=0, column=1, sticky="ns")
-        xscroll.grid(row=1, column=0, sticky="ew")
-
-        # Configure grid weights
-        table_frame.grid_columnconfigure(0, weight=1)
-        table_frame.grid_rowconfigure(0, weight=1)
+        self.cell_table = VirtualTable(
+            table_frame, columns, height=20, tag_column="Status",
+            tag_colors={"Critical": "#ffdddd", "Warning": "#fff3cd"})
+        self.cell_table.pack(fill="both", expand=True)
 
         # Action buttons
         action_frame = ttk.Frame(self.cell_analysis_frame)
@@ -818,15 +1552,8 @@ class CellPerformanceApp(tk.Tk):
         for card in self.summary_cards.values():
             card.update_value("Loading...")
 
-        self.health_chart.ax.clear()
-        self.health_chart.ax.text(0.5, 0.5, "Loading data...",
-                                  ha='center', va='center')
-        self.health_chart.canvas.draw()
-
-        self.status_chart.ax.clear()
-        self.status_chart.ax.text(0.5, 0.5, "Loading data...",
-                                  ha='center', va='center')
-        self.status_chart.canvas.draw()
+        self.health_chart.show_message("Loading data...")
+        self.status_chart.show_message("Loading data...")
 
         # Update UI first, then load data in background
         self.update_idletasks()
@@ -853,15 +1580,8 @@ class CellPerformanceApp(tk.Tk):
             for card in self.summary_cards.values():
                 card.update_value("N/A")
 
-            self.health_chart.ax.clear()
-            self.health_chart.ax.text(0.5, 0.5, "No analysis data",
-                                      ha='center', va='center')
-            self.health_chart.canvas.draw()
-
-            self.status_chart.ax.clear()
-            self.status_chart.ax.text(0.5, 0.5, "No analysis data",
-                                      ha='center', va='center')
-            self.status_chart.canvas.draw()
+            self.health_chart.show_message("No analysis data")
+            self.status_chart.show_message("No analysis data")
 
     def _update_button_states(self, active_tab):
         """Update navigation button states"""
@@ -880,13 +1600,23 @@ class CellPerformanceApp(tk.Tk):
     def _browse_file(self):
         """Handle file browsing"""
         filename = filedialog.askopenfilename(
-            filetypes=[("Excel files", "*.xlsx")],
+            filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv")],
             title="Select KPI Data File"
         )
         if filename:
             self.file_var.set(filename)
             self.current_file = filename
 
+    def _clear_parse_cache(self):
+        """Delete the parsed sheets kept on disk between runs"""
+        try:
+            self.analyzer.parse_cache.clear()
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to clear the cache: {str(e)}")
+            return
+        messagebox.showinfo(
+            "Cache Cleared", "Data files will be parsed again on their next analysis")
+
     def _open_rule_editor(self):
         """Open rule management window"""
         RuleEditor(self)
@@ -904,80 +1634,252 @@ class CellPerformanceApp(tk.Tk):
             messagebox.showerror("Error", "Please select a technology")
             return
 
-        # Disable UI during processing
-        for child in self.analysis_frame.winfo_children():
-            if isinstance(child, ttk.Button):
-                child.config(state="disabled")
+        # No second run until this one is over
+        self.start_button.config(state="disabled")
 
-        # Show loading state
+        # Show loading state; the bar turns determinate once rules run
+        self.progress_bar.config(mode="indeterminate", value=0)
         self.progress_bar.start()
         self.status_label = ttk.Label(
             self.analysis_frame, text="Analyzing data...")
         self.status_label.pack(pady=5)
         self.update_idletasks()
 
+        self.cancel_token = CancelToken()
+        self.cancel_button.config(state="normal")
+
+        # Partial results of this run, filled in by progress messages
+        self.run_progress = {}
+        self.partial_deltas = []
+        self.partial_summary = {}
+        self.partial_cells = {}
+        self.partial_shown = False
+
         # Store selected technology
         self.selected_tech = tech
+        self.analyzer.set_execution(
+            "processes" if self.processes_var.get() else "threads")
 
         # Run in background thread
         threading.Thread(
             target=self._run_analysis,
+            args=(self.cancel_token,),
             daemon=True
         ).start()
 
-    def _run_analysis(self):
-        """Analyze data and update dashboard"""
+    def _run_analysis(self, cancel):
+        """Analyze data and update dashboard.
+
+        Every message of the run is tagged with its CancelToken, so the GUI
+        can tell it from the messages of any other run.
+        """
+        def post(msg_type, content):
+            self.status_queue.put((msg_type, content, cancel))
+
         try:
             file_path = self.file_var.get()
             tech = self.selected_tech
 
             # Clear previous cache for this file
-            cache_key = f"{file_path}_{tech}"
-            if cache_key in self.analyzer.analysis_cache:
-                del self.analyzer.analysis_cache[cache_key]
-            if cache_key in self.analyzer.data_cache:
-                del self.analyzer.data_cache[cache_key]
-
-            # Perform analysis
-            self.summary_data, self.cell_details = self.analyzer.analyze_technology(
-                file_path, tech)
-
-            if self.summary_data is None:
-                self.status_queue.put(
-                    ("error", "Failed to analyze the data file"))
+            self.analyzer.clear_cache(file_path, tech)
+
+            # Perform analysis; partial results stream through status_queue
+            def progress(event):
+                post("progress", event)
+
+            streaming = self.streaming_var.get()
+            if tech == ALL_TECHNOLOGIES:
+                tech_results = self.analyzer.analyze_workbook(
+                    file_path, streaming=streaming, progress=progress,
+                    cancel=cancel)
+                if not tech_results:
+                    post("error", "No 2G/3G/4G sheet found in the workbook")
+                    return
+                summary_data = self.analyzer.network_summary(tech_results)
+                cell_details = AnalysisResult.concat(
+                    {t: details for t, (_, details) in tech_results.items()})
+            else:
+                if streaming:
+                    summary_data, cell_details = \
+                        self.analyzer.analyze_technology_streaming(
+                            file_path, tech, progress=progress, cancel=cancel)
+                else:
+                    summary_data, cell_details = self.analyzer.analyze_technology(
+                        file_path, tech, progress, cancel)
+                tech_results = {tech: (summary_data, cell_details)}
+
+            if summary_data is None:
+                post("error", "Failed to analyze the data file")
                 return
 
-            # Update UI with results
-            self.status_queue.put(("update", None))
+            missing = self.analyzer.get_load_warnings(file_path, tech)
+            if missing:
+                lines = [f"{t}: {', '.join(columns)}"
+                         for t, columns in missing.items()]
+                post(
+                    "warning",
+                    "These rule columns are missing from the data file, so "
+                    "their KPIs report No Data:\n" + "\n".join(lines))
+
+            # Index the results here rather than on the GUI thread
+            cell_details.build_indexes()
+
+            # Update UI with results (assigned on the GUI thread)
+            post("update", (summary_data, cell_details, tech_results))
 
+        except AnalysisCancelled:
+            post("cancelled", None)
         except Exception as e:
-            self.status_queue.put(("error", f"Analysis failed:\n{str(e)}"))
+            post("error", f"Analysis failed:\n{str(e)}")
+        finally:
+            self.analyzer.report_scheduler_stats()
 
-    def _process_status_queue(self):
-        """Process messages from the status queue"""
-        try:
-            while not self.status_queue.empty():
-                msg_type, msg_content = self.status_queue.get_nowait()
+    def _cancel_analysis(self):
+        """Ask the running analysis to stop at its next check"""
+        self.cancel_token.cancel()
+        self.cancel_button.config(state="disabled")
+        if hasattr(self, 'status_label'):
+            self.status_label.config(text="Cancelling...")
 
+    def _process_status_queue(self):
+        """Handle the messages the workers posted since the last wakeup.
+
+        Messages carry the CancelToken of the run or export that posted them;
+        those of any other run or export are dropped.
+        """
+        for msg_type, msg_content, token in self.status_queue.drain():
+            current = self.export_token if msg_type.startswith("export_") \
+                else self.cancel_token
+            if token is not current:
+                continue
+            if msg_type in ("error", "cancelled"):
+                self._finish_run()
+                self.partial_deltas = []
+                if self.partial_shown:
+                    # Partial results of a stopped run are not kept
+                    self.summary_data = self.cell_details = None
+                    self.tech_results = {}
+                    self.partial_shown = False
+                    self._clear_partial_results()
                 if msg_type == "error":
                     messagebox.showerror("Error", msg_content)
-                elif msg_type == "update":
-                    # Update analysis complete
-                    self.progress_bar.stop()
-                    if hasattr(self, 'status_label'):
-                        self.status_label.destroy()
-
-                    # Enable UI
-                    for child in self.analysis_frame.winfo_children():
-                        if isinstance(child, ttk.Button):
-                            child.config(state="normal")
-
-                    # Update dashboard if we're viewing it
-                    if self.dashboard_frame.winfo_ismapped():
-                        self._load_dashboard_data()
-
-        finally:
-            self.after(100, self._process_status_queue)
+            elif msg_type == "warning":
+                messagebox.showwarning("Missing Columns", msg_content)
+            elif msg_type == "export_progress":
+                self._show_export_progress(msg_content)
+            elif msg_type in ("export_done", "export_error",
+                              "export_cancelled"):
+                self._finish_export()
+                if msg_type == "export_done":
+                    messagebox.showinfo("Success", msg_content)
+                elif msg_type == "export_error":
+                    messagebox.showerror("Error", msg_content)
+            elif msg_type == "progress":
+                self._apply_progress(msg_content)
+                self._schedule_partial_redraw()
+            elif msg_type == "update":
+                # Update analysis complete
+                (self.summary_data, self.cell_details,
+                 self.tech_results) = msg_content
+                self.partial_deltas = []
+                self.partial_shown = False
+                self._finish_run()
+
+                # Update the view we're on
+                if self.dashboard_frame.winfo_ismapped():
+                    self._load_dashboard_data()
+                elif self.cell_analysis_frame.winfo_ismapped():
+                    self._update_cell_analysis()
+
+    def _schedule_partial_redraw(self):
+        """Redraw partial results at most once per frame interval"""
+        if self._redraw_job is not None:
+            return
+        elapsed = (time.perf_counter() - self._last_redraw) * 1000
+        delay = max(0, int(self.FRAME_INTERVAL - elapsed))
+        self._redraw_job = self.after(delay, self._redraw_partial_results)
+
+    def _redraw_partial_results(self):
+        self._redraw_job = None
+        self._last_redraw = time.perf_counter()
+        self._show_partial_results()
+
+    def _finish_run(self):
+        """Stop the progress display and enable the UI again"""
+        if self._redraw_job is not None:
+            self.after_cancel(self._redraw_job)
+            self._redraw_job = None
+        self.progress_bar.stop()
+        self.progress_bar.config(mode="determinate", value=0)
+        self.cancel_button.config(state="disabled")
+        if hasattr(self, 'status_label'):
+            self.status_label.destroy()
+
+        self.start_button.config(state="normal")
+
+    def _apply_progress(self, event):
+        """Fold one progress message into the run's partial results"""
+        tech = event["tech"]
+        self.run_progress[tech] = (event["done"], event["total"])
+        # Technologies weigh the same: their steps are rules or cell shards
+        percent = 100 * sum(done / max(total, 1) for done, total
+                            in self.run_progress.values()) \
+            / len(self.run_progress)
+        if str(self.progress_bar["mode"]) != "determinate":
+            self.progress_bar.stop()
+            self.progress_bar.config(mode="determinate", maximum=100)
+        self.progress_bar.config(value=percent)
+        if hasattr(self, 'status_label'):
+            self.status_label.config(text=f"Analyzing data... {percent:.0f}%")
+
+        delta = event["delta"]
+        if delta is None:
+            return  # A technology starting: nothing evaluated yet
+        summary = self.partial_summary.setdefault(
+            tech, {"critical": 0, "warning": 0})
+        summary["total_cells"] = event["total_cells"]
+        critical = len(delta.status_rows("Critical"))
+        summary["critical"] += critical
+        summary["warning"] += len(delta) - critical
+        self.partial_cells.setdefault(tech, set()).update(
+            delta.column("Cell Name").tolist())
+        if len(delta):
+            if self.selected_tech == ALL_TECHNOLOGIES:
+                delta = delta.with_technology(tech)
+            self.partial_deltas.append(delta)
+
+    def _show_partial_results(self):
+        """Show the results evaluated so far on the current view"""
+        self.partial_shown = True
+        summary = {"technology": self.selected_tech,
+                   "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        for key in ("total_cells", "critical", "warning"):
+            summary[key] = sum(s[key] for s in self.partial_summary.values())
+        summary["healthy"] = summary["total_cells"] - \
+            sum(len(cells) for cells in self.partial_cells.values())
+        self.summary_data = summary
+
+        # Rows only ever get appended, so row ids stay valid between updates
+        self.cell_details = AnalysisResult.merge(self.partial_deltas)
+
+        if self.dashboard_frame.winfo_ismapped():
+            for key in ("total_cells", "healthy", "warning", "critical"):
+                card = "total" if key == "total_cells" else key
+                self.summary_cards[card].update_value(str(summary[key]))
+        elif self.cell_analysis_frame.winfo_ismapped():
+            self.kpi_combo["values"] = \
+                ["All"] + sorted(self.cell_details.kpis())
+            self.cell_table.replace_source(self.cell_details)
+            self._filter_cells()
+
+    def _clear_partial_results(self):
+        """Take the partial results of a stopped run off the current view"""
+        if self.dashboard_frame.winfo_ismapped():
+            self._load_dashboard_data()
+        elif self.cell_analysis_frame.winfo_ismapped():
+            self.kpi_combo["values"] = ["All"]
+            self.cell_table.set_source(None)
+            self.match_label.config(text="")
 
     def _update_dashboard(self):
         """Update dashboard with analysis results"""
@@ -1009,16 +1911,13 @@ class CellPerformanceApp(tk.Tk):
                 AppConfig.COLORS['danger']
             ]
 
-            self.health_chart.ax.clear()
-            self.health_chart.ax.pie(sizes, labels=labels, colors=colors, autopct="%1.1f%%",
-                                     startangle=90, wedgeprops={"edgecolor": "white", "linewidth": 1})
-            self.health_chart.ax.set_title("Cell Health Distribution")
-            self.health_chart.fig.tight_layout()
-            self.health_chart.canvas.draw()
+            self.health_chart.update_pie(
+                sizes, labels, colors, "Cell Health Distribution",
+                autopct="%1.1f%%", startangle=90,
+                wedgeprops={"edgecolor": "white", "linewidth": 1})
 
             # Update KPI selector for status chart
-            kpis = list(
-                set(cell["KPI"] for cell in self.cell_details)) if self.cell_details else []
+            kpis = self.cell_details.kpis() if self.cell_details else []
             self.kpi_chart_combo["values"] = kpis
             if kpis:
                 self.kpi_chart_var.set(kpis[0])
@@ -1027,8 +1926,16 @@ class CellPerformanceApp(tk.Tk):
         except Exception as e:
             print(f"Error updating dashboard: {e}")
 
+    def _schedule_status_chart(self, event=None):
+        """Redraw the status chart once the chart controls settle"""
+        if self._chart_job is not None:
+            self.after_cancel(self._chart_job)
+        self._chart_job = self.after(self.CHART_DEBOUNCE,
+                                     self._update_status_chart)
+
     def _update_status_chart(self, event=None):
         """Update the status over time chart based on selected KPI"""
+        self._chart_job = None
         if not self.summary_data or not self.cell_details:
             return
 
@@ -1036,122 +1943,80 @@ class CellPerformanceApp(tk.Tk):
         if not kpi:
             return
 
-        # Get the worst performing cells for this KPI
         n_cells = self.cell_count_var.get()
-        worst_cells = self.analyzer.get_worst_cells_for_kpi(
-            self.cell_details, kpi, n_cells)
-
-        # Prepare data for chart
-        days = ["d1", "d2", "d3", "d4", "d5", "d6", "d7"]
-        x_labels = [f"Day {i+1}" for i in range(7)]
-
-        chart_data = []
-        for cell in worst_cells:
-            values = []
-            for day in days:
-                val = cell.get(day, "No Data")
-                if val == "No Data":
-                    values.append(np.nan)
-                else:
-                    try:
-                        values.append(float(val))
-                    except (ValueError, TypeError):
-                        values.append(np.nan)
-
-            chart_data.append({
-                'label': cell["Cell Name"],
-                'values': values
-            })
+        chart_data = self._status_chart_view(kpi, n_cells)
 
         # Update chart
         self.status_chart.update_chart(
             chart_data,
-            x_labels,
+            [f"Day {i+1}" for i in range(7)],
             title=f"Worst {n_cells} Cells for {kpi}",
             ylabel="KPI Value"
         )
 
+    def _status_chart_view(self, kpi, n_cells):
+        """Chart data of the worst cells of a KPI, from an LRU cache"""
+        if self._chart_source is not self.cell_details:
+            # New results: views of the old ones are stale
+            self._chart_views.clear()
+            self._chart_source = self.cell_details
+
+        key = (kpi, n_cells)
+        if key in self._chart_views:
+            self._chart_views.move_to_end(key)
+            return self._chart_views[key]
+
+        # Get the worst performing cells for this KPI
+        worst_cells = self.analyzer.get_worst_cells_for_kpi(
+            self.cell_details, kpi, n_cells)
+        chart_data = [
+            {'label': name, 'values': list(values)}
+            for name, values in zip(worst_cells.column("Cell Name"),
+                                    worst_cells.day_values())
+        ]
+
+        self._chart_views[key] = chart_data
+        if len(self._chart_views) > self.CHART_CACHE_SIZE:
+            self._chart_views.popitem(last=False)
+        return chart_data
+
     def _update_cell_analysis(self):
         """Update cell analysis view with data"""
-        # Clear existing data
-        self.cell_tree.delete(*self.cell_tree.get_children())
-
         # Get unique KPIs for filter
-        kpis = list(set(cell["KPI"] for cell in self.cell_details))
+        kpis = self.cell_details.kpis()
         self.kpi_combo["values"] = ["All"] + sorted(kpis)
+
+        # Show the result; the table only renders the visible page
+        self.cell_table.set_source(self.cell_details)
+
         self.kpi_var.set("All")
         self.status_var.set("All")
-
-        # Add all cells to treeview
-        for cell in self.cell_details:
-            self._add_cell_to_tree(cell)
+        self.search_var.set("")
 
         # Apply initial filters
         self._filter_cells()
 
-    def _add_cell_to_tree(self, cell):
-        """Add a cell to the treeview"""
-        values = [
-            cell["Cell Name"],
-            cell["KPI"],
-            cell["Status"],
-            cell["Score"],
-            cell["Bad_days"],
-            cell.get("d1", "No Data"),
-            cell.get("d1_count", ""),
-            cell.get("d2", "No Data"),
-            cell.get("d2_count", ""),
-            cell.get("d3", "No Data"),
-            cell.get("d3_count", ""),
-            cell.get("d4", "No Data"),
-            cell.get("d4_count", ""),
-            cell.get("d5", "No Data"),
-            cell.get("d5_count", ""),
-            cell.get("d6", "No Data"),
-            cell.get("d6_count", ""),
-            cell.get("d7", "No Data"),
-            cell.get("d7_count", "")
-        ]
-
-        item = self.cell_tree.insert("", "end", values=values)
-
-        # Color code based on status
-        if cell["Status"] == "Critical":
-            self.cell_tree.tag_configure("critical", background="#ffdddd")
-            self.cell_tree.item(item, tags=("critical",))
-        elif cell["Status"] == "Warning":
-            self.cell_tree.tag_configure("warning", background="#fff3cd")
-            self.cell_tree.item(item, tags=("warning",))
-
     def _filter_cells(self):
         """Filter cells based on selected criteria"""
+        if not self.cell_details:
+            return
         status_filter = self.status_var.get()
         kpi_filter = self.kpi_var.get()
 
-        # Show all items first
-        for item in self.cell_tree.get_children():
-            self.cell_tree.item(item, tags=("visible",))
-
-        # Apply status filter
-        if status_filter != "All":
-            for item in self.cell_tree.get_children():
-                values = self.cell_tree.item(item)["values"]
-                if values[2] != status_filter:  # Status is at index 2
-                    self.cell_tree.item(item, tags=("hidden",))
-
-        # Apply KPI filter
-        if kpi_filter != "All":
-            visible_items = [item for item in self.cell_tree.get_children()
-                             if "visible" in self.cell_tree.item(item)["tags"]]
-
-            for item in visible_items:
-                values = self.cell_tree.item(item)["values"]
-                if values[1] != kpi_filter:  # KPI is at index 1
-                    self.cell_tree.item(item, tags=("hidden",))
-
-        # Hide filtered items
-        self.cell_tree.tag_configure("hidden", foreground="gray90")
-        self.cell_tree.tag_configure("visible", foreground="black")
+        # Intersect the result's status and KPI row indexes
+        rows = self.cell_details.filter_rows(
+            status=None if status_filter == "All" else status_filter,
+            kpi=None if kpi_filter == "All" else kpi_filter)
+
+        # Cell name search: prefix index first, substring fallback
+        search = self.search_var.get().strip()
+        if search:
+            rows = np.intersect1d(rows, self.cell_details.search_rows(search),
+                                  assume_unique=True)
+            self.match_label.config(text=f"{len(rows)} rows")
+        else:
+            self.match_label.config(text="")
+        self.cell_table.set_rows(rows)
 
     def _export_full_report(self):
         """Export full analysis report to Excel with conditional formatting"""
@@ -1169,120 +2034,84 @@ class CellPerformanceApp(tk.Tk):
         if not output_path:
             return
 
-        try:
-            wb = Workbook()
-
-            # Summary sheet
-            ws_summary = wb.active
-            ws_summary.title = "Summary"
-
-            # Add summary information
-            ws_summary.append(["Technology", self.selected_tech])
-            ws_summary.append(
-                ["Analysis Date", self.summary_data["timestamp"]])
-            ws_summary.append(
-                ["Total Cells", self.summary_data["total_cells"]])
-            ws_summary.append(["Healthy Cells", self.summary_data["healthy"]])
-            ws_summary.append(["Warning Cells", self.summary_data["warning"]])
-            ws_summary.append(
-                ["Critical Cells", self.summary_data["critical"]])
-            ws_summary.append(
-                ["Engeneer Overal Comment", ""])
-            # Format summary sheet
-            for row in ws_summary.iter_rows():
-                for cell in row:
-                    cell.font = Font(bold=True)
-
-            # Create a sheet for each KPI
-            kpis = {cell["KPI"] for cell in self.cell_details}
-
-            # Define formatting styles
-            good_fill = PatternFill(
-                start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-            bad_fill = PatternFill(start_color="FFC7CE",
-                                   end_color="FFC7CE", fill_type="solid")
-            warning_fill = PatternFill(
-                start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-            critical_fill = PatternFill(
-                start_color="FF9900", end_color="FF9900", fill_type="solid")
-            bold_font = Font(bold=True)
-
-            for kpi in kpis:
-                # Filter cells for this KPI
-                kpi_cells = [
-                    cell for cell in self.cell_details if cell["KPI"] == kpi]
-
-                # Get the rule for this KPI
-                rule = next(
-                    r for r in self.analyzer.rules[self.selected_tech] if r["kpi"] == kpi)
-                op_func = self.analyzer.ops[rule["operator"]]
-
-                # Create worksheet
-                ws = wb.create_sheet(title=kpi[:30])  # Limit sheet name length
-
-                # Prepare headers
-                headers = ["Cell Name", "Status",
-                           "Score", "Bad Days", "Last 5 Days"]
-                days = ["d1", "d2", "d3", "d4", "d5", "d6", "d7"]
-                for day in days:
-                    headers.extend([f"{day.upper()}", f"{day.upper()}_count"])
-                headers.append("comment")
-                ws.append(headers)
-
-                # Format headers
-                for cell in ws[1]:
-                    cell.font = bold_font
-
-                # Add data
-                for cell in kpi_cells:
-                    row = [
-                        cell["Cell Name"],
-                        cell["Status"],
-                        cell["Score"],
-                        cell["Bad_days"],
-                        cell["Last_5_days"]
-                    ]
-
-                    for day in days:
-                        row.extend([cell.get(day, "No Data"),
-                                    cell.get(f"{day}_count", "")])
-
-                    ws.append(row)
-
-                # Apply conditional formatting
-                for row_idx, row in enumerate(ws.iter_rows(min_row=2, max_row=ws.max_row), start=2):
-                    # Format status column
-                    status_cell = ws.cell(row=row_idx, column=2)
-                    if status_cell.value == "Critical":
-                        status_cell.fill = critical_fill
-                    elif status_cell.value == "Warning":
-                        status_cell.fill = warning_fill
-
-                    # Format KPI values
-                    # Only the value columns (skip counts)
-                    for col_idx in range(6, 20, 2):
-                        cell = ws.cell(row=row_idx, column=col_idx)
-                        try:
-                            value = float(cell.value)
-                            if op_func(value, rule["threshold"]):
-                                cell.fill = good_fill
-                            else:
-                                cell.fill = bad_fill
-                        except (ValueError, TypeError):
-                            pass
-
-            wb.save(output_path)
-            messagebox.showinfo(
-                "Success", f"Analysis exported successfully to:\n{output_path}")
+        # The worker keeps its own references: a new analysis may start
+        # while the file is written
+        details, summary = self.cell_details, self.summary_data
+        tech = self.selected_tech
+
+        def write(progress, cancel):
+            write_full_report(
+                output_path, details, summary, tech,
+                lambda kpi: self.analyzer.find_rule(kpi, tech),
+                progress, cancel)
+
+        self._start_export(
+            write,
+            f"Analysis exported successfully to:\n{output_path}",
+            "Failed to export results")
+
+    def _export_network_report(self):
+        """Export every analyzed technology to one workbook"""
+        if not self.summary_data or not self.tech_results:
+            messagebox.showerror("Error", "No analysis results to export")
+            return
 
-        except Exception as e:
-            messagebox.showerror(
-                "Error", f"Failed to export results:\n{str(e)}")
+        output_path = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx")],
+            title="Save Network Report As...",
+            initialfile="network_analysis.xlsx"
+        )
+
+        if not output_path:
+            return
+
+        tech_results, summary = self.tech_results, self.summary_data
+
+        def write(progress, cancel):
+            # Sheet values are prepared on the analysis workers
+            write_network_report(
+                output_path, tech_results, summary, self.analyzer.find_rule,
+                self.analyzer.scheduler, progress, cancel)
+
+        self._start_export(
+            write,
+            f"Network report exported successfully to:\n{output_path}",
+            "Failed to export network report")
+
+    def _export_data(self):
+        """Export the result columns as a CSV folder, Parquet or JSON Lines"""
+        if not self.summary_data or not self.cell_details:
+            messagebox.showerror("Error", "No analysis results to export")
+            return
+
+        label = self.export_format_var.get()
+        writer, extension = DATA_EXPORTS[label]
+        if extension is None:
+            output_path = filedialog.askdirectory(
+                title="Choose a Folder for the CSV Files")
+        else:
+            output_path = filedialog.asksaveasfilename(
+                defaultextension=extension,
+                filetypes=[(f"{label} files", f"*{extension}")],
+                title="Save Analysis Data As...",
+                initialfile=f"{self.selected_tech}_analysis{extension}"
+            )
+
+        if not output_path:
+            return
+
+        details = self.cell_details
+        self._start_export(
+            lambda progress, cancel: writer(
+                output_path, details, progress, cancel),
+            f"Analysis data exported to:\n{output_path}",
+            "Failed to export data")
 
     def _export_selected_cells(self):
         """Export selected cells to Excel"""
-        selected_items = self.cell_tree.selection()
-        if not selected_items:
+        selected_rows = self.cell_table.selected_rows()
+        if not len(selected_rows):
             messagebox.showerror("Error", "Please select cells to export")
             return
 
@@ -1296,49 +2125,68 @@ class CellPerformanceApp(tk.Tk):
         if not output_path:
             return
 
-        try:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Selected Cells"
-
-            # Prepare headers
-            headers = ["Cell Name", "KPI", "Status", "Score", "Bad Days"]
-            days = ["d1", "d2", "d3", "d4", "d5", "d6", "d7"]
-            for day in days:
-                headers.extend([f"{day.upper()}", f"{day.upper()}_count"])
-
-            ws.append(headers)
-
-            # Format headers
-            for cell in ws[1]:
-                cell.font = Font(bold=True)
-
-            # Define formatting styles
-            warning_fill = PatternFill(
-                start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-            critical_fill = PatternFill(
-                start_color="FF9900", end_color="FF9900", fill_type="solid")
-
-            # Add data
-            for item in selected_items:
-                values = self.cell_tree.item(item)["values"]
-                ws.append(values)
-
-                # Apply formatting based on status
-                status = values[2]  # Status is at index 2
-                for cell in ws[ws.max_row]:
-                    if status == "Critical":
-                        cell.fill = critical_fill
-                    elif status == "Warning":
-                        cell.fill = warning_fill
-
-            wb.save(output_path)
-            messagebox.showinfo(
-                "Success", f"Selected cells exported to:\n{output_path}")
+        rows = self.cell_table.row_values(selected_rows)
+        self._start_export(
+            lambda progress, cancel: write_selected_cells(
+                output_path, rows, progress, cancel),
+            f"Selected cells exported to:\n{output_path}",
+            "Failed to export selected cells")
+
+    def _start_export(self, write, success, failure):
+        """Run write(progress, cancel) on a worker thread.
+
+        Progress goes through status_queue; success or failure (followed by
+        the error) is shown once the worker is done.
+        """
+        if self.export_token is not None:
+            messagebox.showerror("Error", "An export is already running")
+            return
+
+        self.export_token = CancelToken()
+        self.export_label.config(text="Exporting...")
+        self.export_bar.config(value=0)
+        self.export_cancel_button.config(state="normal")
+        self.export_frame.pack(fill="x", side="bottom", padx=20, pady=(0, 10),
+                               before=self.main_frame)
 
+        threading.Thread(
+            target=self._run_export,
+            args=(write, success, failure, self.export_token),
+            daemon=True
+        ).start()
+
+    def _run_export(self, write, success, failure, cancel):
+        """Write an export file (runs on the export thread)"""
+        try:
+            write(lambda event: self.status_queue.put(
+                ("export_progress", event, cancel)), cancel)
+            self.status_queue.put(("export_done", success, cancel))
+        except AnalysisCancelled:
+            self.status_queue.put(("export_cancelled", None, cancel))
         except Exception as e:
-            messagebox.showerror(
-                "Error", f"Failed to export selected cells:\n{str(e)}")
+            self.status_queue.put(
+                ("export_error", f"{failure}:\n{str(e)}", cancel))
+
+    def _cancel_export(self):
+        """Ask the running export to stop; no file is saved then"""
+        if self.export_token is not None:
+            self.export_token.cancel()
+            self.export_cancel_button.config(state="disabled")
+            self.export_label.config(text="Cancelling export...")
+
+    def _show_export_progress(self, event):
+        if self.export_token is None or self.export_token.cancelled:
+            return
+        percent = 100 * event["rows"] / max(event["total_rows"], 1)
+        self.export_bar.config(value=percent)
+        self.export_label.config(
+            text=f"Exporting {event['sheet']}: {event['rows']}/"
+                 f"{event['total_rows']} rows ({event['sheets_done']}/"
+                 f"{event['sheets']} done)")
+
+    def _finish_export(self):
+        self.export_token = None
+        self.export_frame.pack_forget()
 
 # ====== Rule Editor ======
 
@@ -1597,6 +2445,10 @@ class RuleEditor(tk.Toplevel):
 
 # ====== Main Application ======
 if __name__ == "__main__":
+    # Process-pool workers of a run started from this script start here;
+    # frozen builds start from launcher.py, which imports no GUI module first
+    multiprocessing.freeze_support()
+
     # Ensure rules are properly located before starting app
     if getattr(sys, 'frozen', False):
         from version_updater import migrate_rules
@@ -0,0 +1,1014 @@
+"""Vectorized rule engine for the Cell Performance Analyzer.
+
+The KPI sheet is pivoted once over (Cell Name, Date) into a cells x days x KPI
+cube and every rule is evaluated with array comparisons instead of per-cell
+DataFrame filtering. Results match CellAnalyzer.process_cell_data row for row.
+
+This module is also what process-pool workers import, so it must never pull in
+tkinter, matplotlib or the GUI modules.
+"""
+import bisect
+import importlib.util
+import multiprocessing
+import operator
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+OPS = {
+    ">=": operator.ge, "<=": operator.le,
+    ">": operator.gt, "<": operator.lt, "==": operator.eq
+}
+
+N_DAYS = 7          # Days analysed per cell
+LAST_DAYS_FROM = 2  # Index of the first of the "last 5 days"
+
+DAY_COLUMNS = [f"d{i + 1}" for i in range(N_DAYS)]
+COUNT_COLUMNS = [f"{day}_count" for day in DAY_COLUMNS]
+RESULT_COLUMNS = ["Cell Name", "KPI", "Bad_days", "failure_number",
+                  "Last_5_days", "Score"] + \
+    [column for pair in zip(DAY_COLUMNS, COUNT_COLUMNS) for column in pair] + \
+    ["Status"]
+
+
+def latest_dates(df, n_days=N_DAYS):
+    """Return the last n_days distinct dates of the sheet, oldest first"""
+    return np.sort(df["Date"].dropna().unique())[-n_days:]
+
+
+def day_grid(df, dates):
+    """Map every (cell, day) pair to the first row of df holding it.
+
+    Returns the cell names in order of first appearance and a cells x days
+    array of row positions, -1 where the cell has no row for that day.
+    """
+    # One hashing pass; categorical Cell Name columns factorize on their codes
+    cell_codes, cell_names = pd.factorize(df["Cell Name"], use_na_sentinel=False)
+    cell_names = np.asarray(cell_names, dtype=object)
+    day_codes = pd.Index(dates).get_indexer(df["Date"])
+
+    valid = (day_codes >= 0) & df["Cell Name"].notna().to_numpy()
+    positions = np.flatnonzero(valid)
+    keys = cell_codes[positions] * len(dates) + day_codes[positions]
+    # Duplicated (cell, day) rows: keep the first one like iloc[0] did
+    keys, first = np.unique(keys, return_index=True)
+
+    grid = np.full((len(cell_names), len(dates)), -1, dtype=np.int64)
+    grid.flat[keys] = positions[first]
+    return cell_names, grid
+
+
+def column_grid(df, grid, column, default=np.nan):
+    """Gather a numeric column into the shape of grid (NaN where no row)"""
+    values = np.full(grid.shape, np.nan)
+    present = grid >= 0
+    if column in df:
+        source = pd.to_numeric(df[column], errors="coerce").to_numpy(
+            dtype=float, na_value=np.nan)
+        values[present] = source[grid[present]]
+    else:
+        values[present] = default
+    return values
+
+
+def _output_values(values, is_int):
+    """Turn gathered floats back into the sheet's representation"""
+    if is_int:
+        return values.astype(np.int64).astype(object)
+    return values.astype(object)
+
+
+class KpiCube:
+    """Cells x days x KPI arrays of a KPI sheet, shared by every rule.
+
+    values and counts have shape (cells, days, kpis); missing marks slots
+    without a KPI value (no row for that day or an empty cell). counts holds
+    the rule's count column, 0 when the sheet lacks that column and NaN for
+    rules without one.
+    """
+
+    def __init__(self, cell_names, dates, kpis, count_columns, values, counts,
+                 int_values=None, int_counts=None, missing=None):
+        self.cell_names = cell_names
+        self.dates = dates
+        self.kpis = list(kpis)
+        self.count_columns = list(count_columns)
+        self.values = values
+        self.counts = counts
+        self.missing = np.isnan(values) if missing is None else missing
+        n_kpis = len(self.kpis)
+        self.int_values = np.zeros(n_kpis, dtype=bool) \
+            if int_values is None else int_values
+        self.int_counts = np.zeros(n_kpis, dtype=bool) \
+            if int_counts is None else int_counts
+        self._slots = {(kpi, count_col): i for i, (kpi, count_col)
+                       in enumerate(zip(self.kpis, self.count_columns))}
+
+    @staticmethod
+    def rule_slots(rules):
+        """Distinct (kpi, count_column) pairs of the rules, in rule order"""
+        return list(dict.fromkeys(
+            (rule["kpi"], rule.get("count_column")) for rule in rules))
+
+    @classmethod
+    def from_frame(cls, df, rules, n_days=N_DAYS):
+        """Build the cube for all rules from a loaded sheet in one pass"""
+        dates = latest_dates(df, n_days)
+        cell_names, grid = day_grid(df, dates)
+        slots = cls.rule_slots(rules)
+
+        shape = grid.shape + (len(slots),)
+        values = np.full(shape, np.nan)
+        counts = np.full(shape, np.nan)
+        int_values = np.zeros(len(slots), dtype=bool)
+        int_counts = np.zeros(len(slots), dtype=bool)
+        for k, (kpi, count_col) in enumerate(slots):
+            values[:, :, k] = column_grid(df, grid, kpi)
+            int_values[k] = kpi in df and pd.api.types.is_integer_dtype(df[kpi])
+            if count_col is not None:
+                counts[:, :, k] = column_grid(df, grid, count_col, default=0)
+                int_counts[k] = count_col not in df or \
+                    pd.api.types.is_integer_dtype(df[count_col])
+
+        return cls(cell_names, dates, [kpi for kpi, _ in slots],
+                   [count_col for _, count_col in slots], values, counts,
+                   int_values, int_counts)
+
+    @property
+    def n_cells(self):
+        return len(self.cell_names)
+
+    @property
+    def n_days(self):
+        return len(self.dates)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.counts.nbytes + self.missing.nbytes
+
+    def shard(self, start, stop):
+        """Cube restricted to the cells in [start, stop)"""
+        return KpiCube(self.cell_names[start:stop], self.dates, self.kpis,
+                       self.count_columns, self.values[start:stop],
+                       self.counts[start:stop], self.int_values,
+                       self.int_counts, self.missing[start:stop])
+
+    def split(self, n_shards):
+        """Split the cell population into n_shards contiguous shards"""
+        bounds = np.linspace(0, self.n_cells, n_shards + 1).astype(int)
+        return [self.shard(start, stop)
+                for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    def covers(self, rules):
+        """True if every rule's columns are part of the cube"""
+        return all(slot in self._slots for slot in self.rule_slots(rules))
+
+    def integer_columns(self):
+        """Rule columns holding integers (absent count columns read as 0)"""
+        columns = {kpi for kpi, is_int in zip(self.kpis, self.int_values)
+                   if is_int}
+        columns.update(count_col for count_col, is_int
+                       in zip(self.count_columns, self.int_counts)
+                       if count_col is not None and is_int)
+        return columns
+
+    def evaluate(self, rule, min_last_5_bad, raw=False):
+        """Evaluate one rule for every cell.
+
+        Returns the flagged cells as a DataFrame with the same columns as the
+        per-cell engine (unsorted), or None when no cell is flagged. With raw
+        the day columns are floats, NaN instead of "No Data", "-" and "".
+        """
+        k = self._slots[(rule["kpi"], rule.get("count_column"))]
+        values = self.values[:, :, k]
+        has_value = ~self.missing[:, :, k]
+        op_func = OPS[rule["operator"]]
+        with np.errstate(invalid="ignore"):
+            bad = has_value & ~op_func(values, rule["threshold"])
+
+        bad_days = bad.sum(axis=1)
+        last_5_bad = bad[:, LAST_DAYS_FROM:].sum(axis=1)
+        has_count = "count_column" in rule
+        if has_count:
+            counts = self.counts[:, :, k]
+            with np.errstate(invalid="ignore"):
+                over_count = counts > rule["count_threshold"]
+            bad_number = (bad & over_count).sum(axis=1)
+        else:
+            bad_number = np.zeros(self.n_cells, dtype=np.int64)
+
+        if self.n_days == N_DAYS:
+            last_day = bad[:, N_DAYS - 1]
+        else:
+            last_day = np.zeros(self.n_cells, dtype=bool)
+
+        flagged = np.flatnonzero((last_5_bad >= min_last_5_bad) & last_day)
+        if len(flagged) == 0:
+            return None
+
+        result = {
+            "Cell Name": self.cell_names[flagged],
+            "KPI": rule["kpi"],
+            "Bad_days": bad_days[flagged],
+            "failure_number": bad_number[flagged],
+            "Last_5_days": last_5_bad[flagged],
+            "Score": (bad_days + last_5_bad + bad_number)[flagged],
+        }
+        for i in range(self.n_days):
+            col_name = f"d{i + 1}"
+            day_mask = has_value[flagged, i]
+            if raw:
+                result[col_name] = np.where(day_mask, values[flagged, i], np.nan)
+                result[f"{col_name}_count"] = np.where(
+                    day_mask, self.counts[flagged, i, k], np.nan)
+                continue
+            rows = flagged[day_mask]
+
+            day_values = np.full(len(flagged), "No Data", dtype=object)
+            day_values[day_mask] = _output_values(
+                values[rows, i], self.int_values[k])
+            day_counts = np.full(len(flagged), "", dtype=object)
+            if has_count:
+                day_counts[day_mask] = _output_values(
+                    counts[rows, i], self.int_counts[k])
+            else:
+                day_counts[day_mask] = "-"
+
+            result[col_name] = day_values
+            result[f"{col_name}_count"] = day_counts
+
+        result["Status"] = np.where(
+            last_5_bad[flagged] == 5, "Critical", "Warning")
+        return pd.DataFrame(result)
+
+    def evaluate_rules(self, rules, min_last_5_bad, raw=False):
+        """Evaluate all rules of a technology against the cube in one pass"""
+        return [self.evaluate(rule, min_last_5_bad, raw) for rule in rules]
+
+
+def evaluate_rule(df, rule, min_last_5_bad):
+    """Evaluate a single rule straight from a loaded sheet"""
+    return KpiCube.from_frame(df, [rule]).evaluate(rule, min_last_5_bad)
+
+
+def integer_columns(df, rules):
+    """Rule columns of a loaded sheet holding integers.
+
+    Count columns absent from the sheet count as integers: the engines report
+    them as 0.
+    """
+    columns = set()
+    for rule in rules:
+        kpi, count_col = rule["kpi"], rule.get("count_column")
+        if kpi in df and pd.api.types.is_integer_dtype(df[kpi]):
+            columns.add(kpi)
+        if count_col is not None and (
+                count_col not in df or
+                pd.api.types.is_integer_dtype(df[count_col])):
+            columns.add(count_col)
+    return columns
+
+
+# ====== Result store ======
+
+class AnalysisResult:
+    """Flagged (cell, KPI) rows of an analysis, stored column by column.
+
+    frame has the RESULT_COLUMNS (plus Technology for network results) with
+    one row per flagged cell and KPI, in rule order and each rule sorted.
+    Day values and counts are floats, NaN where there is nothing to show.
+    kpi_info records per KPI whether the rule has a count column and whether
+    values and counts were integers, which is what the compatibility
+    accessors need to give back the legacy dicts ("No Data", "-" and "").
+
+    Row-id indexes per KPI (in row order and by Score) and per Status are
+    built on first use and kept, so lookups never rescan the frame.
+    """
+
+    def __init__(self, frame, kpi_info):
+        self.frame = frame.reset_index(drop=True)
+        self.kpi_info = kpi_info
+        self._kpi_rows = None
+        self._kpi_top = None
+        self._status_rows = None
+        self._name_keys = None   # Sorted lower-cased distinct cell names
+        self._name_series = None
+        self._name_order = None  # Row ids grouped by those names, in order
+        self._name_bounds = None  # Start of each name's group, then the end
+        self._sort_orders = {}   # (column, descending) -> (order, rank)
+
+    @classmethod
+    def from_rule_results(cls, results, rules, int_columns=()):
+        """Combine sorted per-rule frames of either engine into one store"""
+        frames = []
+        kpi_info = {}
+        for rule, res in zip(rules, results):
+            count_col = rule.get("count_column")
+            kpi_info[rule["kpi"]] = {
+                "count": "count_column" in rule,
+                "int_value": rule["kpi"] in int_columns,
+                "int_count": count_col in int_columns,
+            }
+            if res is not None and not res.empty:
+                frames.append(res)
+
+        if not frames:
+            return cls(cls._empty_frame(), kpi_info)
+        frame = pd.concat(frames, ignore_index=True)
+        for column in DAY_COLUMNS + COUNT_COLUMNS:
+            if column in frame:
+                # The per-cell engine writes "No Data", "-" and "" strings
+                frame[column] = pd.to_numeric(frame[column], errors="coerce")
+            else:
+                frame[column] = np.nan  # Sheet with fewer than N_DAYS dates
+        for column in ("KPI", "Status"):
+            frame[column] = frame[column].astype("category")
+        return cls(frame[RESULT_COLUMNS], kpi_info)
+
+    @classmethod
+    def merge(cls, results):
+        """One result holding the rows of several results, one after another"""
+        kpi_info = {}
+        for result in results:
+            kpi_info.update(result.kpi_info)
+        frames = [result.frame for result in results if len(result)]
+        if not frames:
+            return cls(cls._empty_frame(), kpi_info)
+        frame = pd.concat(frames, ignore_index=True)
+        for column in ("KPI", "Status", "Technology"):
+            if column in frame:
+                frame[column] = frame[column].astype("category")
+        return cls(frame, kpi_info)
+
+    @classmethod
+    def concat(cls, results):
+        """Network result of {tech: AnalysisResult}, with a Technology column"""
+        return cls.merge([result.with_technology(tech)
+                          for tech, result in results.items()])
+
+    def with_technology(self, tech):
+        """The same rows tagged with a Technology column"""
+        return AnalysisResult(self.frame.assign(Technology=tech), self.kpi_info)
+
+    @staticmethod
+    def _empty_frame():
+        frame = pd.DataFrame({column: pd.Series(dtype=float)
+                              for column in RESULT_COLUMNS})
+        for column in ("Cell Name", "KPI", "Status"):
+            frame[column] = frame[column].astype(object)
+        return frame
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __iter__(self):
+        return iter(self.records())
+
+    def __getitem__(self, row):
+        return self.records([row])[0]
+
+    @property
+    def columns(self):
+        return list(self.frame.columns)
+
+    def column(self, name, rows=None):
+        """Raw values of a column (NaN for missing day data) as an array.
+
+        Only the given rows are converted, so a page of rows costs the same
+        however large the result is.
+        """
+        values = self.frame[name]
+        if rows is not None:
+            values = values.iloc[rows]
+        return values.to_numpy()
+
+    @staticmethod
+    def _group_rows(codes, n_groups, order):
+        """Split a row order sorted by group code into one array per group"""
+        bounds = np.searchsorted(codes[order], np.arange(n_groups + 1))
+        return [order[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    def _build_indexes(self):
+        if self._kpi_rows is not None:
+            return
+        kpi_codes, kpis = pd.factorize(self.frame["KPI"])
+        kpis = np.asarray(kpis, dtype=object)
+        in_order = np.argsort(kpi_codes, kind="stable")
+        # Highest Score first; lexsort is stable so ties keep row order
+        by_score = np.lexsort((-self.frame["Score"].to_numpy(), kpi_codes))
+        self._kpi_rows = dict(zip(kpis, self._group_rows(
+            kpi_codes, len(kpis), in_order)))
+        self._kpi_top = dict(zip(kpis, self._group_rows(
+            kpi_codes, len(kpis), by_score)))
+
+        status_codes, statuses = pd.factorize(self.frame["Status"])
+        self._status_rows = dict(zip(
+            np.asarray(statuses, dtype=object),
+            self._group_rows(status_codes, len(statuses),
+                             np.argsort(status_codes, kind="stable"))))
+
+    def build_indexes(self):
+        """Build every index now, e.g. off the GUI thread"""
+        self._build_indexes()
+        self._build_name_index()
+
+    def kpis(self):
+        """KPIs with flagged cells, in rule order"""
+        self._build_indexes()
+        return list(self._kpi_rows)
+
+    def n_cells(self):
+        """Number of distinct flagged cells"""
+        return self.frame["Cell Name"].nunique()
+
+    def kpi_rows(self, kpi):
+        """Row ids of a KPI, in row order"""
+        self._build_indexes()
+        return self._kpi_rows.get(kpi, np.empty(0, dtype=np.int64))
+
+    def status_rows(self, status):
+        """Row ids with a Status ("Critical" or "Warning"), in row order"""
+        self._build_indexes()
+        return self._status_rows.get(status, np.empty(0, dtype=np.int64))
+
+    def filter_rows(self, status=None, kpi=None):
+        """Row ids matching a Status and/or KPI, in row order.
+
+        Intersects the sorted status and KPI indexes, so the cost follows the
+        size of the matching groups rather than of the whole result.
+        """
+        if status is None and kpi is None:
+            return np.arange(len(self.frame))
+        if kpi is None:
+            return self.status_rows(status)
+        if status is None:
+            return self.kpi_rows(kpi)
+        return np.intersect1d(self.status_rows(status), self.kpi_rows(kpi),
+                              assume_unique=True)
+
+    def _build_name_index(self):
+        if self._name_keys is not None:
+            return
+        names = self.frame["Cell Name"].astype(str).str.lower().to_numpy()
+        codes, uniques = pd.factorize(names)
+        order = np.argsort(uniques)
+        # Renumber the codes so that code order is sorted name order
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        codes = rank[codes]
+        self._name_keys = list(uniques[order])
+        self._name_series = pd.Series(self._name_keys, dtype=object)
+        self._name_order = np.argsort(codes, kind="stable")
+        self._name_bounds = np.searchsorted(
+            codes[self._name_order], np.arange(len(order) + 1))
+
+    def search_rows(self, text):
+        """Row ids whose Cell Name starts with text, in row order.
+
+        Matching is case-insensitive. A bisect over the sorted distinct names
+        answers prefixes; when no name has the prefix the names containing
+        text are returned instead.
+        """
+        self._build_name_index()
+        key = text.strip().lower()
+        if not key:
+            return np.arange(len(self.frame))
+        start = bisect.bisect_left(self._name_keys, key)
+        stop = bisect.bisect_left(self._name_keys, key + "\uffff", start)
+        if start < stop:
+            # Names sharing a prefix are adjacent: their rows are one slice
+            rows = self._name_order[
+                self._name_bounds[start]:self._name_bounds[stop]]
+        else:
+            contains = self._name_series.str.contains(
+                key, regex=False).to_numpy(dtype=bool)
+            rows = self._name_order[
+                np.repeat(contains, np.diff(self._name_bounds))]
+        return np.sort(rows)
+
+    def _sort_order(self, column, descending):
+        """Cached argsort of a column and its inverse (each row's rank)"""
+        key = (column, descending)
+        if key not in self._sort_orders:
+            values = self.frame[column]
+            if pd.api.types.is_numeric_dtype(values):
+                keys = values.to_numpy(dtype=float)
+            else:
+                keys = pd.factorize(values.astype(str), sort=True)[0] \
+                    .astype(float)
+            missing = np.isnan(keys)
+            if descending:
+                keys = -keys
+            # Missing values ("No Data") last either way; ties keep row order
+            order = np.lexsort((np.where(missing, 0, keys), missing))
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            self._sort_orders[key] = (order, rank)
+        return self._sort_orders[key]
+
+    def sort_rows(self, rows, column, descending=False):
+        """Row ids reordered by a column, missing day values last"""
+        order, rank = self._sort_order(column, descending)
+        if len(rows) == len(order):
+            return order  # All rows: the cached permutation itself
+        return rows[np.argsort(rank[rows])]
+
+    def is_numeric(self, column):
+        return pd.api.types.is_numeric_dtype(self.frame[column])
+
+    def top_rows(self, kpi, n):
+        """Row ids of the n highest Scores of a KPI (ties in row order)"""
+        self._build_indexes()
+        return self._kpi_top.get(kpi, np.empty(0, dtype=np.int64))[:n]
+
+    def rank_cells(self, n, weights=None, default_weight=1.0):
+        """Top n cells by their weighted Score summed over every KPI.
+
+        weights maps KPI to weight (default_weight for the others). With a
+        Technology column a cell is a (Technology, Cell Name) pair. Returns a
+        DataFrame ordered worst first: the cell, its weighted Score, how many
+        KPIs and Critical KPIs flag it and its worst KPI.
+        """
+        frame = self.frame
+        keys = [key for key in ("Technology", "Cell Name") if key in frame]
+        if len(frame) == 0 or n <= 0:
+            return pd.DataFrame(columns=keys + ["Score", "KPIs", "Critical",
+                                                "Worst KPI"])
+
+        kpi_codes, kpis = pd.factorize(frame["KPI"])
+        kpi_weights = np.array([(weights or {}).get(kpi, default_weight)
+                                for kpi in kpis], dtype=float)
+        scores = frame["Score"].to_numpy(dtype=float) * kpi_weights[kpi_codes]
+        if len(keys) == 1:
+            cell_codes, _ = pd.factorize(frame[keys[0]])
+        else:
+            cell_codes, _ = pd.factorize(pd.MultiIndex.from_frame(frame[keys]))
+        n_cells = cell_codes.max() + 1
+        totals = np.bincount(cell_codes, weights=scores, minlength=n_cells)
+
+        # Partitioning keeps the cut-off O(cells) however many are flagged;
+        # cells tied at it are taken in order of first appearance
+        if n < n_cells:
+            cutoff = -np.partition(-totals, n - 1)[n - 1]
+            above = np.flatnonzero(totals > cutoff)
+            tied = np.flatnonzero(totals == cutoff)[:n - len(above)]
+            top = np.concatenate([above, tied])
+        else:
+            top = np.arange(n_cells)
+        top = top[np.lexsort((top, -totals[top]))]  # Ties: first seen first
+
+        # Worst KPI of each cell: its first row with the highest weighted
+        # score, found with grouped max/min passes instead of a sort
+        best = np.full(n_cells, -np.inf)
+        np.maximum.at(best, cell_codes, scores)
+        hits = np.flatnonzero(scores == best[cell_codes])
+        first = np.full(n_cells, len(frame))
+        np.minimum.at(first, cell_codes[hits], hits)
+        worst_rows = first[top]
+        critical = (frame["Status"] == "Critical").to_numpy()
+
+        ranking = {key: frame[key].to_numpy()[worst_rows] for key in keys}
+        ranking["Score"] = totals[top]
+        ranking["KPIs"] = np.bincount(cell_codes, minlength=n_cells)[top]
+        ranking["Critical"] = np.bincount(
+            cell_codes, weights=critical, minlength=n_cells)[top].astype(int)
+        ranking["Worst KPI"] = np.asarray(kpis, dtype=object)[
+            kpi_codes[worst_rows]]
+        return pd.DataFrame(ranking)
+
+    def day_values(self, rows=None):
+        """rows x days array of the day values, NaN where there was no data"""
+        frame = self.frame if rows is None else self.frame.iloc[rows]
+        return frame[DAY_COLUMNS].to_numpy(dtype=float)
+
+    def take(self, rows):
+        """Result restricted to the given row ids, in that order"""
+        return AnalysisResult(self.frame.iloc[rows], self.kpi_info)
+
+    def display_column(self, name, rows=None, kpis=None):
+        """Column values as the legacy dicts held them.
+
+        Day values read "No Data" where missing; counts read "" with no day
+        value and "-" for rules without a count column. Integer columns come
+        back as ints. kpis, the KPI values of the same rows, saves reading
+        them again (see display_columns).
+        """
+        values = self.column(name, rows)
+        if name not in DAY_COLUMNS and name not in COUNT_COLUMNS:
+            return values.astype(object)
+
+        day = name[:-len("_count")] if name in COUNT_COLUMNS else name
+        has_value = ~np.isnan(self.column(day, rows).astype(float))
+        if kpis is None:
+            kpis = self.column("KPI", rows)
+        out = np.empty(len(values), dtype=object)
+        for kpi in pd.unique(kpis):
+            info = self.kpi_info.get(kpi, {})
+            in_kpi = kpis == kpi
+            present = in_kpi & has_value
+            if name == day:
+                out[in_kpi] = "No Data"
+                as_int = info.get("int_value", False)
+            else:
+                out[in_kpi] = ""
+                if not info.get("count", False):
+                    out[present] = "-"
+                    continue
+                as_int = info.get("int_count", False)
+            picked = values[present]
+            out[present] = picked.astype(np.int64).astype(object) \
+                if as_int else picked.astype(object)
+        return out
+
+    def display_columns(self, names, rows=None):
+        """display_column of several columns, reading the KPIs once"""
+        kpis = self.column("KPI", rows)
+        return [self.display_column(name, rows, kpis) for name in names]
+
+    def records(self, rows=None):
+        """Rows as the legacy list of dicts (compatibility accessor)"""
+        names = list(self.frame.columns)
+        columns = dict(zip(names, self.display_columns(names, rows)))
+        n_rows = len(self.frame) if rows is None else len(rows)
+        return [{name: values[i] for name, values in columns.items()}
+                for i in range(n_rows)]
+
+
+class StreamingCubeBuilder:
+    """Fold KPI rows into a KpiCube one chunk at a time.
+
+    Only the latest n_days dates seen so far are kept, as one cells x columns
+    slab per date, so memory is bounded by the number of cells and not by the
+    number of rows. The cube equals KpiCube.from_frame on the whole sheet.
+    """
+
+    def __init__(self, rules, n_days=N_DAYS):
+        self.slots = KpiCube.rule_slots(rules)
+        self.columns = list(dict.fromkeys(
+            column for slot in self.slots for column in slot if column is not None))
+        self.n_days = n_days
+        self.rows_read = 0
+        self._column_index = {column: i for i, column in enumerate(self.columns)}
+        self._available = None
+        self._int_columns = dict.fromkeys(self.columns, True)
+        self._codes = {}   # cell name -> code, in order of first appearance
+        self._names = []
+        self._nan_code = None
+        self._capacity = 0
+        self._days = {}    # date -> (present, data) slabs
+
+    def add(self, chunk):
+        """Fold one chunk of rows (with a parsed Date column) into the slabs"""
+        self.rows_read += len(chunk)
+        if self._available is None:
+            self._available = set(chunk.columns)
+        codes = self._encode(chunk["Cell Name"])
+
+        data = np.full((len(chunk), len(self.columns)), np.nan)
+        for column, i in self._column_index.items():
+            if column in chunk:
+                data[:, i] = pd.to_numeric(chunk[column], errors="coerce").to_numpy(
+                    dtype=float, na_value=np.nan)
+                self._int_columns[column] &= pd.api.types.is_integer_dtype(
+                    chunk[column])
+
+        dates = chunk["Date"].to_numpy(dtype="datetime64[ns]")
+        valid = ~np.isnat(dates) & chunk["Cell Name"].notna().to_numpy()
+        for day in np.unique(dates[valid]):
+            slab = self._slab(day)
+            if slab is None:
+                continue  # Older than every day in the window
+            present, slab_data = slab
+            rows = np.flatnonzero(valid & (dates == day))
+            # Keep the first row of each cell, like the full-sheet pivot
+            cell_codes, first = np.unique(codes[rows], return_index=True)
+            new = ~present[cell_codes]
+            present[cell_codes[new]] = True
+            slab_data[cell_codes[new]] = data[rows[first[new]]]
+
+    def _encode(self, names):
+        """Global cell codes of a chunk's Cell Name column"""
+        inverse, uniques = pd.factorize(names, use_na_sentinel=False)
+        chunk_codes = np.empty(len(uniques), dtype=np.int64)
+        for i, name in enumerate(uniques):
+            if pd.isna(name):
+                if self._nan_code is None:
+                    self._nan_code = len(self._names)
+                    self._names.append(np.nan)
+                chunk_codes[i] = self._nan_code
+                continue
+            code = self._codes.get(name)
+            if code is None:
+                code = self._codes[name] = len(self._names)
+                self._names.append(name)
+            chunk_codes[i] = code
+        self._grow(len(self._names))
+        return chunk_codes[inverse]
+
+    def _grow(self, n_cells):
+        if n_cells <= self._capacity:
+            return
+        capacity = max(n_cells, 2 * self._capacity, 1024)
+        for day, (present, data) in self._days.items():
+            grown_present = np.zeros(capacity, dtype=bool)
+            grown_present[:self._capacity] = present
+            grown_data = np.full((capacity, len(self.columns)), np.nan)
+            grown_data[:self._capacity] = data
+            self._days[day] = (grown_present, grown_data)
+        self._capacity = capacity
+
+    def _slab(self, day):
+        """Slab of a day, evicting the oldest day if the window is full"""
+        if day in self._days:
+            return self._days[day]
+        if len(self._days) >= self.n_days:
+            oldest = min(self._days)
+            if day < oldest:
+                return None
+            del self._days[oldest]
+        self._days[day] = (np.zeros(self._capacity, dtype=bool),
+                           np.full((self._capacity, len(self.columns)), np.nan))
+        return self._days[day]
+
+    def missing_columns(self):
+        """Rule columns absent from the streamed sheet"""
+        available = self._available or set()
+        return [column for column in self.columns if column not in available]
+
+    def build(self):
+        """Assemble the KpiCube of everything folded so far"""
+        available = self._available or set()
+        dates = np.array(sorted(self._days), dtype="datetime64[ns]")
+        n_cells = len(self._names)
+        shape = (n_cells, len(dates), len(self.slots))
+        values = np.full(shape, np.nan)
+        counts = np.full(shape, np.nan)
+        int_values = np.zeros(len(self.slots), dtype=bool)
+        int_counts = np.zeros(len(self.slots), dtype=bool)
+
+        for k, (kpi, count_col) in enumerate(self.slots):
+            int_values[k] = kpi in available and self._int_columns[kpi]
+            if count_col is not None:
+                int_counts[k] = count_col not in available or \
+                    self._int_columns[count_col]
+
+        for d, day in enumerate(dates):
+            present, data = self._days[day]
+            present = present[:n_cells]
+            data = data[:n_cells]
+            for k, (kpi, count_col) in enumerate(self.slots):
+                values[present, d, k] = data[present, self._column_index[kpi]]
+                if count_col is None:
+                    continue
+                if count_col in available:
+                    counts[present, d, k] = \
+                        data[present, self._column_index[count_col]]
+                else:
+                    counts[present, d, k] = 0
+
+        return KpiCube(np.array(self._names, dtype=object), dates,
+                       [kpi for kpi, _ in self.slots],
+                       [count_col for _, count_col in self.slots],
+                       values, counts, int_values, int_counts)
+
+
+# ====== Process pool execution ======
+
+def evaluate_shard(shard, rules, min_last_5_bad, raw=False):
+    """Worker entry point: evaluate every rule on one shard of the cube"""
+    return shard.evaluate_rules(rules, min_last_5_bad, raw)
+
+
+def merge_shard_results(shard_results):
+    """Concatenate the per-rule results of several shards, in shard order"""
+    merged = []
+    for rule_results in zip(*shard_results):
+        frames = [res for res in rule_results if res is not None]
+        merged.append(pd.concat(frames, ignore_index=True) if frames else None)
+    return merged
+
+
+_main_lock = threading.RLock()
+
+
+@contextmanager
+def _engine_as_main():
+    """Make spawned workers import this module as __main__.
+
+    Spawned children re-run the parent's main module; for the GUI scripts that
+    would import tkinter and matplotlib in every worker.
+    """
+    with _main_lock:
+        main_module = sys.modules["__main__"]
+        saved_spec = getattr(main_module, "__spec__", None)
+        main_module.__spec__ = importlib.util.find_spec(__name__)
+        try:
+            yield
+        finally:
+            main_module.__spec__ = saved_spec
+
+
+class EngineProcessPool(ProcessPoolExecutor):
+    """Spawn-based process pool whose workers only import this module"""
+
+    def __init__(self, max_workers):
+        super().__init__(max_workers=max_workers,
+                         mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, *args, **kwargs):
+        # Spawn pools start their workers on demand inside submit()
+        with _engine_as_main():
+            return super().submit(*args, **kwargs)
+
+
+# ====== Scheduling ======
+
+class AnalysisCancelled(Exception):
+    """Raised inside an analysis run once its CancelToken is cancelled"""
+
+
+class CancelToken:
+    """Cooperative cancellation flag shared by the stages of one run"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Raise AnalysisCancelled if the run has been cancelled"""
+        if self._event.is_set():
+            raise AnalysisCancelled()
+
+
+class AnalysisScheduler:
+    """Single bounded executor shared by all analysis work.
+
+    Threads (and the process pool, started on first use) are created once and
+    reused across runs, so total concurrency never exceeds max_workers per
+    pool. Tasks submitted from inside a scheduler thread run inline instead of
+    queueing behind their parent, which keeps nested work from deadlocking.
+    """
+
+    def __init__(self, max_workers=4, process_workers=None):
+        self.max_workers = max_workers
+        self.process_workers = process_workers or max_workers
+        self._threads = None
+        self._processes = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._queued = 0
+        self._running = 0
+        self._timings = {}
+        self._process_tasks = set()
+
+    def submit(self, name, fn, *args, processes=False, **kwargs):
+        """Queue fn(*args, **kwargs) and return its Future.
+
+        name groups the task in the timing statistics; processes=True runs it
+        in the process pool (fn and its arguments must be picklable).
+        """
+        if getattr(self._local, "in_worker", False) and not processes:
+            return self._run_inline(name, fn, args, kwargs)
+
+        submitted = time.perf_counter()
+        with self._lock:
+            if processes:
+                if self._processes is None:
+                    self._processes = EngineProcessPool(self.process_workers)
+                pool = self._processes
+            else:
+                self._queued += 1
+                if self._threads is None:
+                    self._threads = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="analysis")
+                pool = self._threads
+
+        if processes:
+            # Worker start times are not visible here: time the round trip,
+            # and count the task as in flight until it is done
+            future = pool.submit(fn, *args, **kwargs)
+            with self._lock:
+                self._process_tasks.add(future)
+            future.add_done_callback(
+                lambda f: self._process_done(name, submitted, f))
+            return future
+
+        def run():
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            self._local.in_worker = True
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._local.in_worker = False
+                self._finish(name, submitted, started)
+
+        future = pool.submit(run)
+        future.add_done_callback(self._forget_cancelled)
+        return future
+
+    def _run_inline(self, name, fn, args, kwargs):
+        future = Future()
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            self._finish(name, started, started)
+        return future
+
+    def _forget_cancelled(self, future):
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def _process_done(self, name, submitted, future):
+        with self._lock:
+            self._process_tasks.discard(future)
+        if not future.cancelled():
+            self._record(name, submitted, submitted)
+
+    def _finish(self, name, submitted, started):
+        with self._lock:
+            self._running -= 1
+        self._record(name, submitted, started)
+
+    def _record(self, name, submitted, started):
+        finished = time.perf_counter()
+        with self._lock:
+            timing = self._timings.setdefault(name, {
+                "count": 0, "total": 0.0, "max": 0.0, "wait": 0.0})
+            elapsed = finished - started
+            timing["count"] += 1
+            timing["total"] += elapsed
+            timing["max"] = max(timing["max"], elapsed)
+            timing["wait"] += started - submitted
+
+    def stats(self):
+        """Queue depth, running tasks and per-task timings (seconds).
+
+        queued and running count thread tasks. The process pool does not say
+        when a task starts, so its tasks are counted apart as in_flight
+        (queued or running) until they are done.
+        """
+        with self._lock:
+            tasks = {}
+            for name, timing in self._timings.items():
+                tasks[name] = dict(timing)
+                tasks[name]["mean"] = timing["total"] / timing["count"]
+            return {
+                "max_workers": self.max_workers,
+                "process_workers": self.process_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "in_flight": len(self._process_tasks),
+                "tasks": tasks,
+            }
+
+    def cancel(self, futures):
+        """Cancel tasks of an abandoned run without waiting for them.
+
+        Queued tasks are dropped. Running threads cannot be interrupted (they
+        are expected to check the run's CancelToken); if a process task is
+        still running, the process pool's workers are terminated and the pool
+        is recreated on the next submit.
+        """
+        running = [future for future in futures
+                   if not future.cancel() and not future.done()]
+        with self._lock:
+            pool = self._processes
+            if pool is None or not any(future in self._process_tasks
+                                       for future in running):
+                return
+            self._processes = None
+        workers = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for worker in workers:
+            worker.terminate()
+
+    def shutdown(self, wait=True):
+        """Stop all workers; the pools are recreated on the next submit"""
+        with self._lock:
+            pools = (self._threads, self._processes)
+            self._threads = self._processes = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,424 @@
+"""KPI workbook loading for the Cell Performance Analyzer.
+
+Like cell_engine this module is GUI-free: sheets are parsed from scheduler
+threads and from worker processes.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+try:
+    import pyarrow  # noqa: F401  (Parquet support for the parse cache)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+# Files read as CSV instead of xlsx
+CSV_EXTENSIONS = (".csv", ".txt")
+
+# Rows read_sheet parses between cancellation checks (CSV parses much faster)
+READ_CHUNK_ROWS = 2000
+CSV_READ_CHUNK_ROWS = 50000
+
+# Columns every KPI sheet needs besides the rule columns
+KEY_COLUMNS = ["Date", "Cell Name"]
+
+# Date layouts tried in order; OSS exports are day-first
+DATE_FORMATS = (
+    "%d/%m/%Y", "%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S",
+    "%d-%m-%Y", "%d.%m.%Y", "%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y/%m/%d",
+    "%d/%m/%y", "%d-%b-%Y", "%d-%b-%y",
+)
+DATE_SAMPLE_SIZE = 200
+
+# float32 holds integers exactly up to 2**24
+FLOAT32_EXACT_LIMIT = 2 ** 24
+
+# Sheet-name hints per technology, matched case-insensitively
+TECH_SHEET_NAMES = {
+    "2G": ("2g", "gsm", "geran"),
+    "3G": ("3g", "umts", "wcdma", "utran"),
+    "4G": ("4g", "lte", "eutran"),
+}
+
+
+def is_csv(file_path):
+    return str(file_path).lower().endswith(CSV_EXTENSIONS)
+
+
+def rule_columns(rules):
+    """Columns a list of rules reads (kpi and count columns), in rule order"""
+    columns = []
+    for rule in rules:
+        columns.append(rule["kpi"])
+        if rule.get("count_column"):
+            columns.append(rule["count_column"])
+    return list(dict.fromkeys(columns))
+
+
+def required_columns(rules):
+    """Columns needed to evaluate rules: the key columns plus rule columns"""
+    return list(dict.fromkeys(KEY_COLUMNS + rule_columns(rules)))
+
+
+def missing_columns(df, rules):
+    """Rule columns (kpi or count column) absent from a loaded sheet"""
+    return [column for column in rule_columns(rules) if column not in df.columns]
+
+
+_date_formats = {}  # date shape (e.g. "99/99/9999") -> detected format
+
+
+def _date_shape(text):
+    return re.sub(r"[0-9]", "9", re.sub(r"[A-Za-z]", "a", text))
+
+
+def detect_date_format(values):
+    """Format parsing every sample date string the same way as dayfirst=True.
+
+    The result is cached by the shape of the first sample, so every chunk and
+    every later file with the same layout skips detection. Returns None when
+    no known format fits.
+    """
+    sample = [str(v).strip() for v in values[:DATE_SAMPLE_SIZE]]
+    if not sample:
+        return None
+    shape = _date_shape(sample[0])
+    if shape in _date_formats:
+        return _date_formats[shape]
+
+    fmt = None
+    for candidate in DATE_FORMATS:
+        try:
+            pd.to_datetime(pd.Series(sample), format=candidate)
+        except (ValueError, TypeError):
+            continue
+        fmt = candidate
+        break
+    _date_formats[shape] = fmt
+    return fmt
+
+
+def parse_dates(column):
+    """Parse a Date column, with an explicit format when one is detected"""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column
+    sample = column.iloc[:DATE_SAMPLE_SIZE].dropna()
+    if len(sample) and all(isinstance(v, str) for v in sample):
+        fmt = detect_date_format(sample.to_numpy())
+        if fmt is not None:
+            try:
+                return pd.to_datetime(column, format=fmt)
+            except ValueError:
+                pass  # Later rows use another layout
+    return pd.to_datetime(column, dayfirst=True)
+
+
+def _float32_safe(values):
+    """True if a float64 array round-trips through float32 unchanged"""
+    finite = values[np.isfinite(values)]
+    if len(finite) and np.abs(finite).max() >= FLOAT32_EXACT_LIMIT:
+        return False
+    return np.array_equal(values.astype(np.float32).astype(np.float64),
+                          values, equal_nan=True)
+
+
+def compact_frame(df):
+    """Convert a parsed sheet to the compact in-memory schema.
+
+    Cell Name becomes categorical, integer columns take the smallest integer
+    type and float columns become float32 when that loses no precision (it
+    does for most percentages, which stay float64). The memory used before
+    and after is kept in df.attrs["memory"].
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    df["Cell Name"] = df["Cell Name"].astype("category")
+    for column in df.columns:
+        if column in KEY_COLUMNS:
+            continue
+        series = df[column]
+        if pd.api.types.is_integer_dtype(series):
+            df[column] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series) and \
+                _float32_safe(series.to_numpy(dtype=np.float64)):
+            df[column] = series.astype(np.float32)
+    after = int(df.memory_usage(deep=True).sum())
+    df.attrs["memory"] = {"before": before, "after": after}
+    return df
+
+
+def open_workbook(file_path):
+    """Open an xlsx file read-only; close it with its close method.
+
+    Its sheets can be streamed from several threads at once, and the shared
+    strings are parsed once for all of them.
+    """
+    return load_workbook(file_path, read_only=True, data_only=True)
+
+
+def read_headers(wb):
+    """Return {sheet name: header columns} for every sheet of a workbook"""
+    headers = {}
+    for ws in wb.worksheets:
+        header = next(ws.iter_rows(max_row=1, values_only=True), ())
+        headers[ws.title] = [name for name in header if name is not None]
+    return headers
+
+
+def map_technology_sheets(headers, rules_by_tech):
+    """Match workbook sheets to technologies.
+
+    Sheets are matched by name first (e.g. "3G", "UMTS", "LTE"); technologies
+    still unmatched take the remaining sheet holding most of their rule
+    columns. Returns {tech: sheet name} for the technologies found.
+    """
+    mapping = {}
+    for tech, hints in TECH_SHEET_NAMES.items():
+        matches = [name for name in headers
+                   if any(hint in str(name).lower() for hint in hints)]
+        if len(matches) == 1:
+            mapping[tech] = matches[0]
+
+    for tech in TECH_SHEET_NAMES:
+        if tech in mapping:
+            continue
+        wanted = set(rule_columns(rules_by_tech.get(tech, [])))
+        free = [name for name in headers if name not in mapping.values()]
+        scores = {name: len(wanted.intersection(headers[name]))
+                  for name in free}
+        if scores and max(scores.values()) > 0:
+            mapping[tech] = max(scores, key=scores.get)
+    return mapping
+
+
+def resolve_sheet(file_path, tech, rules_by_tech):
+    """Sheet of a technology; single-sheet files always use their only sheet"""
+    if is_csv(file_path):
+        return 0
+    wb = open_workbook(file_path)
+    try:
+        if len(wb.sheetnames) == 1:
+            return wb.sheetnames[0]
+        mapping = map_technology_sheets(read_headers(wb), rules_by_tech)
+        return mapping.get(tech, wb.sheetnames[0])
+    finally:
+        wb.close()
+
+
+def read_sheet(file_path, sheet_name=0, columns=None, compact=True,
+               cancel=None, workbook=None):
+    """Parse one KPI sheet and its Date column.
+
+    With columns given only those columns are kept; OSS exports carry a few
+    hundred KPI columns of which the rules read a handful. With compact the
+    frame is converted by compact_frame. The sheet is read in chunks and the
+    CancelToken cancel, if given, is checked after each one. workbook is an
+    already open_workbook handle of file_path to read from.
+    """
+    chunksize = CSV_READ_CHUNK_ROWS if is_csv(file_path) else READ_CHUNK_ROWS
+    chunks = []
+    for chunk in iter_sheet_chunks(file_path, sheet_name, columns, chunksize,
+                                   workbook):
+        if cancel is not None:
+            cancel.check()
+        chunks.append(chunk)
+    if not chunks:
+        raise ValueError(f"Sheet {sheet_name!r} has no data rows")
+    df = pd.concat(chunks, ignore_index=True)
+    return compact_frame(df) if compact else df
+
+
+def iter_sheet_chunks(file_path, sheet_name=0, columns=None, chunksize=50000,
+                      workbook=None):
+    """Yield a KPI sheet as DataFrames of at most chunksize rows.
+
+    CSV files go through pandas' chunked reader; xlsx sheets are streamed row
+    by row from a read-only workbook, so the whole sheet is never in memory.
+    The sheet is read from workbook when given (it is left open), otherwise
+    from a workbook opened for this sheet only.
+    """
+    usecols = None if columns is None else set(columns).__contains__
+    if is_csv(file_path):
+        for chunk in pd.read_csv(file_path, usecols=usecols, chunksize=chunksize):
+            chunk["Date"] = parse_dates(chunk["Date"])
+            yield chunk
+        return
+
+    wb = workbook or open_workbook(file_path)
+    try:
+        if isinstance(sheet_name, int):
+            ws = wb.worksheets[sheet_name]
+        else:
+            ws = wb[sheet_name]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        keep = [i for i, name in enumerate(header)
+                if name is not None and (usecols is None or usecols(name))]
+        names = [header[i] for i in keep]
+
+        batch = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue  # read_excel skips blank lines too
+            batch.append([row[i] if i < len(row) else None for i in keep])
+            if len(batch) >= chunksize:
+                yield _chunk_frame(batch, names)
+                batch = []
+        if batch:
+            yield _chunk_frame(batch, names)
+    finally:
+        if workbook is None:
+            wb.close()
+
+
+def _chunk_frame(batch, names):
+    chunk = pd.DataFrame(batch, columns=names)
+    chunk["Date"] = parse_dates(chunk["Date"])
+    return chunk
+
+
+# ====== Parse cache ======
+
+def _columns_key(columns):
+    return "*" if columns is None else json.dumps(sorted(map(str, columns)))
+
+
+def file_signature(file_path):
+    """Identity of a file version: absolute path, size and modification time"""
+    stat = os.stat(file_path)
+    return [os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns]
+
+
+class ParseCache:
+    """On-disk cache of parsed KPI sheets.
+
+    Entries are keyed by the file signature (path, size, mtime), the sheet
+    name and the projected columns, and stored as Parquet when pyarrow is
+    available, pickle otherwise. Writes go through a temporary file so an
+    interrupted run never leaves a truncated entry behind. Only the
+    max_entries most recently used entries are kept.
+    """
+
+    INDEX_FILE = "sheets.json"
+    MAX_INDEX_ENTRIES = 200
+    SCHEMA_VERSION = 2  # Bumped when the stored frame layout changes
+
+    def __init__(self, directory, max_entries=20):
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def _key(self, file_path, *parts):
+        payload = json.dumps(file_signature(file_path) + [self.SCHEMA_VERSION] +
+                             [str(p) for p in parts])
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".parquet", base + ".pkl"
+
+    def load(self, file_path, sheet_name, columns=None):
+        """Return the cached frame of a sheet, or None"""
+        try:
+            key = self._key(file_path, sheet_name, _columns_key(columns))
+        except OSError:
+            return None
+        for path in self._paths(key):
+            if not os.path.exists(path):
+                continue
+            try:
+                if path.endswith(".parquet"):
+                    df = pd.read_parquet(path)
+                else:
+                    df = pd.read_pickle(path)
+            except Exception as e:
+                print(f"Discarding unreadable cache entry {path}: {e}")
+                os.remove(path)
+                return None
+            os.utime(path)  # Mark as recently used
+            return df
+        return None
+
+    def store(self, df, file_path, sheet_name, columns=None):
+        """Write a parsed sheet to the cache (failures are only reported)"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            parquet_path, pickle_path = self._paths(
+                self._key(file_path, sheet_name, _columns_key(columns)))
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            os.close(fd)
+        except OSError as e:
+            print(f"Parse cache disabled: {e}")
+            return
+        try:
+            try:
+                if not HAS_PYARROW:
+                    raise ImportError("pyarrow is not installed")
+                df.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, parquet_path)
+            except (ImportError, ValueError, TypeError, NotImplementedError) as e:
+                # Mixed-type or non-string columns cannot go to Parquet
+                if HAS_PYARROW:
+                    print(f"Parse cache falls back to pickle: {e}")
+                df.to_pickle(tmp_path)
+                os.replace(tmp_path, pickle_path)
+            self._prune()
+        except OSError as e:
+            print(f"Failed to write parse cache entry: {e}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def sheet_for(self, file_path, tech):
+        """Previously resolved sheet of a technology in this file version"""
+        try:
+            return self._read_index().get(self._key(file_path, "tech", tech))
+        except OSError:
+            return None
+
+    def remember_sheet(self, file_path, tech, sheet_name):
+        """Record the sheet resolved for a technology in this file version"""
+        index = self._read_index()
+        index[self._key(file_path, "tech", tech)] = sheet_name
+        # Oldest entries first: keep the most recent ones
+        index = dict(list(index.items())[-self.MAX_INDEX_ENTRIES:])
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = index_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print(f"Failed to update parse cache index: {e}")
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.directory, self.INDEX_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _prune(self):
+        entries = [os.path.join(self.directory, name)
+                   for name in os.listdir(self.directory)
+                   if name.endswith((".parquet", ".pkl"))]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[self.max_entries:]:
+            os.remove(path)
+
+    def clear(self):
+        """Delete every cache entry"""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith((".parquet", ".pkl", ".json")):
+                os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,28 @@
+"""Entry point of the frozen (PyInstaller) Cell Performance Analyzer build.
+
+Process-pool workers of a frozen build start by running the entry script,
+so freeze_support() is called before any GUI module (tkinter, matplotlib)
+is imported. Starts CPA_WCL; pass --cpa to start CPA instead.
+"""
+import multiprocessing
+import sys
+
+
+def main():
+    if "--cpa" in sys.argv[1:]:
+        from CPA import CellPerformanceApp
+    else:
+        from CPA_WCL import CellPerformanceApp
+
+        # Ensure rules are properly located before starting app
+        if getattr(sys, 'frozen', False):
+            from version_updater import migrate_rules
+            migrate_rules()
+
+    app = CellPerformanceApp()
+    app.mainloop()
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
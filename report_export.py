@@ -0,0 +1,450 @@
+"""Report export for the Cell Performance Analyzer.
+
+Like cell_engine and kpi_loader this module is GUI-free. Reports are written
+from an AnalysisResult with write-only worksheets, so memory stays flat
+however many rows are exported. KPI sheets are colored by native conditional
+formatting rules instead of per-cell fills.
+
+The data exports (a CSV folder, Parquet and JSON Lines) are written straight
+from the result columns with pandas, for tools that only want the table.
+"""
+import os
+import re
+import shutil
+import tempfile
+from collections import deque
+from contextlib import contextmanager
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import CellIsRule, FormulaRule
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from cell_engine import COUNT_COLUMNS, DAY_COLUMNS, CancelToken
+from kpi_loader import HAS_PYARROW
+
+
+def _fill(color):
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+GOOD_FILL = _fill("C6EFCE")
+BAD_FILL = _fill("FFC7CE")
+WARNING_FILL = _fill("FFEB9C")
+CRITICAL_FILL = _fill("FF9900")
+STATUS_FILLS = {"Critical": CRITICAL_FILL, "Warning": WARNING_FILL}
+BOLD_FONT = Font(bold=True)
+
+# Result columns of a KPI sheet and their headings
+KPI_SHEET_COLUMNS = ["Cell Name", "Status", "Score", "Bad_days", "Last_5_days"]
+for _day in DAY_COLUMNS:
+    KPI_SHEET_COLUMNS.extend([_day, f"{_day}_count"])
+KPI_SHEET_HEADERS = ["Cell Name", "Status", "Score", "Bad Days", "Last 5 Days"]
+for _day in DAY_COLUMNS:
+    KPI_SHEET_HEADERS.extend([_day.upper(), f"{_day.upper()}_count"])
+KPI_SHEET_HEADERS.append("comment")
+
+# Columns of the selected-cells export
+SELECTED_CELLS_HEADERS = ["Cell Name", "KPI", "Status", "Score", "Bad Days"]
+for _day in DAY_COLUMNS:
+    SELECTED_CELLS_HEADERS.extend([_day.upper(), f"{_day.upper()}_count"])
+
+# Per-technology table of a network report's Summary sheet
+NETWORK_HEADERS = ["Technology", "Total Cells", "Healthy Cells",
+                   "Warning Cells", "Critical Cells"]
+NETWORK_COLUMNS = ["total_cells", "healthy", "warning", "critical"]
+
+# Excel spelling of the rule operators
+EXCEL_OPERATORS = {">=": ">=", "<=": "<=", ">": ">", "<": "<", "==": "="}
+
+# Sheet titles are limited to 31 characters
+SHEET_TITLE_LENGTH = 30
+
+# Rows written between progress reports and cancellation checks
+PROGRESS_ROWS = 2000
+# Rows per write (and Parquet row group) of the data exports
+DATA_CHUNK_ROWS = 50000
+
+# Characters file names cannot hold on Windows
+UNSAFE_FILENAME = re.compile(r'[<>:"/\\|?*]')
+
+
+class ExportProgress:
+    """Row and sheet counts of an export, reported as they grow.
+
+    progress, if given, is called with a dict (sheet, sheets_done, sheets,
+    rows, total_rows); every report first checks the CancelToken cancel.
+    """
+
+    def __init__(self, total_rows, total_sheets, progress=None, cancel=None):
+        self.total_rows = total_rows
+        self.total_sheets = total_sheets
+        self.progress = progress
+        self.cancel = cancel or CancelToken()
+        self.sheet = ""
+        self.sheets_done = 0
+        self.rows = 0
+
+    def start_sheet(self, title):
+        self.sheet = title
+        self._report()
+
+    def add_rows(self, n_rows):
+        self.rows += n_rows
+        self._report()
+
+    def end_sheet(self):
+        self.sheets_done += 1
+        self._report()
+
+    def _report(self):
+        self.cancel.check()
+        if self.progress is not None:
+            self.progress({
+                "sheet": self.sheet,
+                "sheets_done": self.sheets_done,
+                "sheets": self.total_sheets,
+                "rows": self.rows,
+                "total_rows": self.total_rows,
+            })
+
+
+def _cell(ws, value, font=None, fill=None):
+    """A write-only cell carrying its style"""
+    cell = WriteOnlyCell(ws, value=value)
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    return cell
+
+
+def write_summary_sheet(wb, tech, summary):
+    """Summary sheet of a report, every cell bold"""
+    ws = wb.create_sheet("Summary")
+    rows = [
+        ["Technology", tech],
+        ["Analysis Date", summary["timestamp"]],
+        ["Total Cells", summary["total_cells"]],
+        ["Healthy Cells", summary["healthy"]],
+        ["Warning Cells", summary["warning"]],
+        ["Critical Cells", summary["critical"]],
+        ["Engeneer Overal Comment", ""],
+    ]
+    for row in rows:
+        ws.append([_cell(ws, value, BOLD_FONT) for value in row])
+    return ws
+
+
+def kpi_sheet_data(result, kpi):
+    """Display values of a KPI sheet's data rows, one array per column"""
+    rows = result.kpi_rows(kpi)
+    return result.display_columns(KPI_SHEET_COLUMNS, rows)
+
+
+def write_kpi_sheet(wb, result, kpi, rule, tracker=None):
+    """Sheet of one KPI's rows, colored by conditional formatting"""
+    return write_kpi_data(wb, kpi[:SHEET_TITLE_LENGTH],
+                          kpi_sheet_data(result, kpi), rule, tracker)
+
+
+def write_kpi_data(wb, title, data, rule, tracker=None):
+    """KPI sheet from the columns kpi_sheet_data prepared"""
+    tracker = tracker or ExportProgress(0, 0)
+    ws = wb.create_sheet(title)
+    tracker.start_sheet(ws.title)
+    ws.append([_cell(ws, header, BOLD_FONT) for header in KPI_SHEET_HEADERS])
+
+    n_rows = len(data[0])
+    for start in range(0, n_rows, PROGRESS_ROWS):
+        stop = min(start + PROGRESS_ROWS, n_rows)
+        for row in zip(*(column[start:stop] for column in data)):
+            ws.append(row)
+        tracker.add_rows(stop - start)
+    if n_rows:
+        add_kpi_formatting(ws, rule, n_rows)
+    tracker.end_sheet()
+    return ws
+
+
+def add_kpi_formatting(ws, rule, n_rows):
+    """Conditional formatting of a KPI sheet holding n_rows data rows.
+
+    Day values that pass the rule are green and failing ones red; "No Data"
+    cells and counts stay unstyled. Status cells are colored by status.
+    """
+    last_row = n_rows + 1
+    letters = [get_column_letter(KPI_SHEET_COLUMNS.index(day) + 1)
+               for day in DAY_COLUMNS]
+    value_range = " ".join(f"{letter}2:{letter}{last_row}"
+                           for letter in letters)
+    # Relative to the top-left cell, like any Excel formula rule
+    first = f"{letters[0]}2"
+    test = f"{first}{EXCEL_OPERATORS[rule['operator']]}{rule['threshold']}"
+    ws.conditional_formatting.add(value_range, FormulaRule(
+        formula=[f"AND(ISNUMBER({first}),{test})"], fill=GOOD_FILL))
+    ws.conditional_formatting.add(value_range, FormulaRule(
+        formula=[f"AND(ISNUMBER({first}),NOT({test}))"], fill=BAD_FILL))
+
+    status = get_column_letter(KPI_SHEET_COLUMNS.index("Status") + 1)
+    for value, fill in STATUS_FILLS.items():
+        ws.conditional_formatting.add(
+            f"{status}2:{status}{last_row}",
+            CellIsRule(operator="equal", formula=[f'"{value}"'], fill=fill))
+
+
+def write_full_report(path, result, summary, tech, find_rule,
+                      progress=None, cancel=None):
+    """Write the Summary sheet and one sheet per KPI of result to path.
+
+    find_rule(kpi) returns the rule a KPI was evaluated with. Cancelling
+    cancel raises AnalysisCancelled before anything is saved to path.
+    """
+    kpis = result.kpis()
+    tracker = ExportProgress(len(result), len(kpis), progress, cancel)
+    wb = Workbook(write_only=True)
+    try:
+        write_summary_sheet(wb, tech, summary)
+        for kpi in kpis:
+            write_kpi_sheet(wb, result, kpi, find_rule(kpi), tracker)
+        tracker.cancel.check()
+    except BaseException:
+        _discard(wb)
+        raise
+    wb.save(path)
+
+
+def write_network_summary_sheet(wb, summary, tech_results):
+    """Network Summary sheet: the totals, then a row per technology"""
+    ws = write_summary_sheet(wb, summary["technology"], summary)
+    ws.append([])
+    ws.append([_cell(ws, header, BOLD_FONT) for header in NETWORK_HEADERS])
+    for tech, (tech_summary, _) in tech_results.items():
+        ws.append([tech] + [tech_summary[key] for key in NETWORK_COLUMNS])
+    return ws
+
+
+def _prepared(items, prepare, scheduler, ahead):
+    """Yield prepare(*item) for each item, in order.
+
+    With a scheduler, up to ahead items are prepared on its workers while
+    the caller consumes earlier ones; tasks still queued when the caller
+    stops are cancelled.
+    """
+    if scheduler is None:
+        for item in items:
+            yield prepare(*item)
+        return
+
+    items = iter(items)
+    pending = deque()
+    try:
+        while True:
+            while len(pending) < ahead:
+                item = next(items, None)
+                if item is None:
+                    break
+                pending.append(scheduler.submit("report", prepare, *item))
+            if not pending:
+                return
+            yield pending.popleft().result()
+    finally:
+        scheduler.cancel(pending)
+
+
+def write_network_report(path, tech_results, summary, find_rule,
+                         scheduler=None, progress=None, cancel=None):
+    """Write every technology of a network analysis to one workbook.
+
+    tech_results maps each technology to (summary, AnalysisResult) and
+    summary is their network summary; find_rule(kpi, tech) returns a KPI's
+    rule. The workbook holds a Summary sheet, then one sheet per technology
+    and KPI titled "<tech> <kpi>". With an AnalysisScheduler the sheet
+    values are prepared on its worker threads while earlier sheets are
+    written; writing the workbook itself stays on the calling thread.
+    """
+    sheets = [(tech, kpi) for tech, (_, result) in tech_results.items()
+              for kpi in result.kpis()]
+    total_rows = sum(len(result) for _, result in tech_results.values())
+    tracker = ExportProgress(total_rows, len(sheets), progress, cancel)
+
+    def prepare(tech, kpi):
+        tracker.cancel.check()
+        return kpi_sheet_data(tech_results[tech][1], kpi)
+
+    ahead = 2 * scheduler.max_workers if scheduler is not None else 1
+    payloads = _prepared(sheets, prepare, scheduler, ahead)
+    wb = Workbook(write_only=True)
+    try:
+        write_network_summary_sheet(wb, summary, tech_results)
+        for (tech, kpi), data in zip(sheets, payloads):
+            title = f"{tech} {kpi}"[:SHEET_TITLE_LENGTH]
+            write_kpi_data(wb, title, data, find_rule(kpi, tech), tracker)
+        tracker.cancel.check()
+    except BaseException:
+        _discard(wb)
+        raise
+    finally:
+        payloads.close()
+    wb.save(path)
+
+
+def write_selected_cells(path, rows, progress=None, cancel=None):
+    """Write rows of SELECTED_CELLS_HEADERS values, filled by their Status"""
+    tracker = ExportProgress(len(rows), 1, progress, cancel)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Selected Cells")
+    try:
+        tracker.start_sheet(ws.title)
+        ws.append([_cell(ws, header, BOLD_FONT)
+                   for header in SELECTED_CELLS_HEADERS])
+
+        status_column = SELECTED_CELLS_HEADERS.index("Status")
+        for i, values in enumerate(rows, start=1):
+            fill = STATUS_FILLS.get(values[status_column])
+            if fill is None:
+                ws.append(values)
+            else:
+                ws.append([_cell(ws, value, fill=fill) for value in values])
+            if i % PROGRESS_ROWS == 0:
+                tracker.add_rows(PROGRESS_ROWS)
+        tracker.add_rows(len(rows) % PROGRESS_ROWS)
+        tracker.end_sheet()
+    except BaseException:
+        _discard(wb)
+        raise
+    wb.save(path)
+
+
+def _discard(wb):
+    """Close the sheets of a write-only workbook that will not be saved"""
+    for ws in wb.worksheets:
+        try:
+            ws.close()
+        except Exception:
+            pass  # The sheet's own error is the one being raised
+
+
+# ====== Data exports ======
+
+def export_frame(result, rows=None, kpi=None):
+    """Plain frame of the exported columns of result.
+
+    Day values and counts are empty where there was no data. With kpi, the
+    rows belong to that KPI and its integer values and counts are written
+    as integers.
+    """
+    columns = (["Technology"] if "Technology" in result.columns else [])
+    columns += ["KPI"] + KPI_SHEET_COLUMNS
+    frame = result.frame if rows is None else result.frame.iloc[rows]
+    frame = frame[columns].reset_index(drop=True)
+    for column in ("Technology", "KPI", "Status"):
+        if column in frame:
+            frame[column] = frame[column].astype(object)
+    if kpi is not None:
+        info = result.kpi_info.get(kpi, {})
+        for names, as_int in ((DAY_COLUMNS, info.get("int_value")),
+                              (COUNT_COLUMNS, info.get("int_count"))):
+            if as_int:
+                frame[names] = frame[names].astype("Int64")
+    return frame
+
+
+@contextmanager
+def _replaced_on_success(path):
+    """Temporary path next to path, moved over it once the block succeeds"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _chunks(frame):
+    for start in range(0, len(frame), DATA_CHUNK_ROWS):
+        yield frame.iloc[start:start + DATA_CHUNK_ROWS]
+
+
+def csv_filename(kpi):
+    """File name of a KPI in a CSV folder export"""
+    return UNSAFE_FILENAME.sub("_", kpi) + ".csv"
+
+
+def write_csv_dir(directory, result, progress=None, cancel=None):
+    """One CSV file per KPI in directory, named by csv_filename.
+
+    The files are written to a temporary folder in directory and moved in
+    once all of them are complete, so a failed or cancelled export leaves
+    the folder (and any earlier export in it) as it was.
+    """
+    kpis = result.kpis()
+    tracker = ExportProgress(len(result), len(kpis), progress, cancel)
+    os.makedirs(directory, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=directory, suffix=".tmp")
+    try:
+        for kpi in kpis:
+            name = csv_filename(kpi)
+            tracker.start_sheet(name)
+            frame = export_frame(result, result.kpi_rows(kpi), kpi)
+            with open(os.path.join(tmp_dir, name), "w", newline="",
+                      encoding="utf-8") as f:
+                frame.iloc[:0].to_csv(f, index=False)
+                for chunk in _chunks(frame):
+                    chunk.to_csv(f, index=False, header=False)
+                    tracker.add_rows(len(chunk))
+            tracker.end_sheet()
+        tracker.cancel.check()
+        for name in os.listdir(tmp_dir):
+            os.replace(os.path.join(tmp_dir, name),
+                       os.path.join(directory, name))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def write_parquet(path, result, progress=None, cancel=None):
+    """Every row of result in one Parquet file"""
+    if not HAS_PYARROW:
+        raise ImportError("Parquet export needs pyarrow (pip install pyarrow)")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tracker = ExportProgress(len(result), 1, progress, cancel)
+    tracker.start_sheet(os.path.basename(path))
+    frame = export_frame(result)
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    with _replaced_on_success(path) as tmp_path:
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for chunk in _chunks(frame):
+                writer.write_table(pa.Table.from_pandas(
+                    chunk, schema=schema, preserve_index=False))
+                tracker.add_rows(len(chunk))
+        tracker.end_sheet()
+
+
+def write_jsonl(path, result, progress=None, cancel=None):
+    """Every row of result as one JSON object per line"""
+    tracker = ExportProgress(len(result), 1, progress, cancel)
+    tracker.start_sheet(os.path.basename(path))
+    frame = export_frame(result)
+    with _replaced_on_success(path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for chunk in _chunks(frame):
+                text = chunk.to_json(orient="records", lines=True,
+                                     force_ascii=False)
+                # Older pandas leave out the last line's newline
+                f.write(text if text.endswith("\n") else text + "\n")
+                tracker.add_rows(len(chunk))
+        tracker.end_sheet()
+
+
+# Data export formats: label -> (writer, file extension or None for a folder)
+DATA_EXPORTS = {
+    "CSV folder": (write_csv_dir, None),
+    "Parquet": (write_parquet, ".parquet"),
+    "JSON Lines": (write_jsonl, ".jsonl"),
+}